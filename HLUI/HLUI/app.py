@@ -1,14 +1,25 @@
 import os
+import sys
+import array
 import logging
 import time
 import struct
+import threading
+import functools
+import inspect
+import heapq
+import itertools
+import random
+import math
+from concurrent.futures import Future
 from fastapi import FastAPI, Form, Request, BackgroundTasks
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, PlainTextResponse, Response
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from datetime import datetime
 from typing import Optional
 import asyncio
+import json
 
 # 导入原有的Modbus相关模块
 from Agilebot.IR.A.arm import Arm
@@ -18,7 +29,33 @@ from Agilebot.IR.A.sdk_types import ModbusChannel
 from Agilebot.IR.A.sdk_types import ModbusParity
 from Agilebot.IR.A.sdk_types import SignalType, SignalValue  # 新增导入
 
+# HL和HLUI共用的寄存器工具gripper_common，依次在脚本目录(打包时由build_apps.py放在app.py旁边)、
+# 仓库中的common目录和sys.path中查找。easyService注入globals加载脚本时可能没有__file__，
+# 脚本目录再依次由代码对象的文件名和工作目录推断
+_APP_DIRS = []
+for _file in (globals().get('__file__'), sys._getframe().f_code.co_filename, os.path.join(os.getcwd(), "app.py")):
+    if _file and os.path.isfile(_file):
+        _dir = os.path.dirname(os.path.abspath(_file))
+        if _dir not in _APP_DIRS:
+            _APP_DIRS.append(_dir)
+_APP_DIR = _APP_DIRS[0] if _APP_DIRS else os.getcwd()
+_COMMON_DIRS = [path for base in _APP_DIRS for path in (base, os.path.normpath(os.path.join(base, "..", "..", "common")))]
+for _path in _COMMON_DIRS:
+    if os.path.isfile(os.path.join(_path, "gripper_common.py")):
+        if _path not in sys.path:
+            sys.path.insert(0, _path)
+        break
+try:
+    from gripper_common import (BAUD_RATE_MAP, REGISTER_MAP, REGISTER_TTL, REGISTERS, BusMetrics, ModbusHelper,
+                                RegisterField, RegisterLayout, default_ttl, register_layout)
+except ModuleNotFoundError as e:
+    if e.name != "gripper_common":
+        raise
+    raise ImportError(f"找不到HLUI依赖的gripper_common.py(已查找{'、'.join(_COMMON_DIRS) or '脚本目录(未能确定)'}和sys.path)，"
+                      f"请用build_apps.py重新打包HLUI，或把common/gripper_common.py复制到app.py所在目录") from e
+
 PORT = os.getenv("PORT", "8000")
+CONTROLLER_IP = os.getenv("CONTROLLER_IP", "10.27.1.254")
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
@@ -27,135 +64,650 @@ templates = Jinja2Templates(directory="templates")
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # 全局变量存储机械臂状态
-arm_connection = None
 slave_instance = None
-arm_instance = None  # 新增：用于数字输出控制的机械臂实例
 connection_status = "未连接"
 modbus_status = "未连接"  # Modbus连接状态
-reconnect_attempts = 0
-max_reconnect_attempts = 5  # 最大重连次数
-reconnect_interval = 10  # 重连间隔(秒)
+HEARTBEAT_INTERVAL = 3  # 连接状态检查间隔(秒)
 last_modbus_check = None  # 最后Modbus检查时间
 modbus_connected = False  # Modbus连接状态
 last_modbus_check_success = False  # 上次Modbus检查是否成功
-# 新增：存储选择的数字输出端口
-selected_digital_output = 1  # 默认使用DO1作为modbus连接状态输出信号
+# Modbus连接状态指示数字输出
+indicator_outputs = [1]  # 指示用数字输出端口，默认DO1，可同时驱动多个
+indicator_pattern = "steady"  # steady: 连接时常亮; pulse: 连接时每个心跳周期翻转
+INDICATOR_PATTERNS = ("steady", "pulse")
+INDICATOR_REASSERT_INTERVAL = 60  # 状态未变化时的重新下发间隔(秒)
+indicator_state = {}  # 各端口最近一次成功下发的值
+indicator_last_assert = {}  # 各端口最近一次成功下发的时间(monotonic)
+
 
 
 
 
+# 总线任务优先级(数值越小越优先)
+PRIORITY_MOTION = 0  # 运动/停止命令
+PRIORITY_WRITE = 1  # 参数写入、连接管理
+PRIORITY_READ = 2  # 按需读取
+PRIORITY_POLL = 3  # 周期性轮询、心跳
+# 各优先级任务的排队期限(秒)，超过期限仍未执行的任务直接丢弃
+JOB_DEADLINES = {
+    PRIORITY_MOTION: 2.0,
+    PRIORITY_WRITE: 5.0,
+    PRIORITY_READ: 3.0,
+    PRIORITY_POLL: 1.0
+}
+
+class BusJobExpired(TimeoutError):
+    """总线任务排队超过期限"""
 
-class ModbusHelper:
-    """Modbus通信辅助类"""
+class BusJob:
+    """总线调度队列中的一个任务"""
     
-    @staticmethod
-    def float_to_registers(float_value):
-        """将浮点数转换为两个16位寄存器"""
-        packed = struct.pack('>f', float_value)
-        high_word = struct.unpack('>H', packed[:2])[0]
-        low_word = struct.unpack('>H', packed[2:])[0]
-        return [high_word, low_word]
+    def __init__(self, func, priority: int, deadline: float, key=None):
+        self.func = func
+        self.priority = priority
+        self.deadline = deadline
+        self.key = key
+        self.waiters = []  # 等待该任务结果的Future，合并的读取任务共享同一次执行
+
+class BusScheduler:
+    """
+    总线命令调度器
+    
+    所有阻塞的SDK调用都在单个工作线程中串行执行，避免阻塞事件循环。
+    任务按优先级出队，运动命令优先于参数写入和状态轮询；相同的读取任务
+    在排队期间合并为一次执行；超过期限仍未执行的任务直接丢弃。
+    """
+    
+    def __init__(self):
+        self._queue = []  # (优先级, 序号, 任务)
+        self._pending = {}  # 合并键 -> 排队中的任务
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running = True
+        self.executed = 0
+        self.expired = 0
+        self.coalesced = 0
+        self._thread = threading.Thread(target=self._worker, name="modbus-bus", daemon=True)
+        self._thread.start()
+    
+    def submit(self, func, priority: int = PRIORITY_READ, key=None, deadline: Optional[float] = None) -> Future:
+        """提交任务，返回concurrent.futures.Future"""
+        future = Future()
+        expires_at = time.monotonic() + (deadline if deadline is not None else JOB_DEADLINES[priority])
+        with self._cond:
+            job = self._pending.get(key) if key is not None else None
+            if job is not None and job.priority <= priority:
+                # 已有相同任务排队，共享其结果并以较新的期限为准
+                job.deadline = max(job.deadline, expires_at)
+                self.coalesced += 1
+            else:
+                job = BusJob(func, priority, expires_at, key)
+                if key is not None:
+                    self._pending[key] = job
+                heapq.heappush(self._queue, (priority, next(self._seq), job))
+                self._cond.notify()
+            job.waiters.append(future)
+        return future
+    
+    def _worker(self):
+        """工作线程: 按优先级逐个执行任务"""
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                _, _, job = heapq.heappop(self._queue)
+                if job.key is not None and self._pending.get(job.key) is job:
+                    del self._pending[job.key]
+            
+            waiters = [f for f in job.waiters if f.set_running_or_notify_cancel()]
+            if not waiters:
+                continue
+            if time.monotonic() > job.deadline:
+                self.expired += 1
+                for future in waiters:
+                    future.set_exception(BusJobExpired("总线繁忙，任务排队超时"))
+                continue
+            
+            try:
+                result = job.func()
+            except BaseException as e:
+                for future in waiters:
+                    future.set_exception(e)
+            else:
+                for future in waiters:
+                    future.set_result(result)
+            self.executed += 1
+    
+    def stats(self):
+        """获取调度统计"""
+        with self._cond:
+            queued = {}
+            for priority, _, _ in self._queue:
+                queued[priority] = queued.get(priority, 0) + 1
+            return {
+                "queued": queued,
+                "executed": self.executed,
+                "expired": self.expired,
+                "coalesced": self.coalesced
+            }
+    
+    def shutdown(self):
+        """停止工作线程，丢弃排队中的任务"""
+        with self._cond:
+            self._running = False
+            for _, _, job in self._queue:
+                for future in job.waiters:
+                    future.cancel()
+            self._queue.clear()
+            self._pending.clear()
+            self._cond.notify_all()
+
+bus_scheduler = BusScheduler()
+
+async def run_on_bus(func, *args, priority: int = PRIORITY_READ, deadline: Optional[float] = None):
+    """
+    在总线调度器中运行阻塞的SDK调用
+    
+    读取及轮询任务按(函数, 参数)合并，排队中的重复请求只执行一次。
+    """
+    key = (func.__name__,) + args if priority >= PRIORITY_READ else None
+    future = bus_scheduler.submit(functools.partial(func, *args), priority, key, deadline)
+    return await asyncio.wrap_future(future)
+
+# 写入后需要失效而不是直接更新缓存的命令寄存器(初始化、保存参数、复位多圈)
+COMMAND_REGISTERS = {field.address for field in REGISTER_MAP if field.command}
+
+class RegisterCache:
+    """夹爪寄存器镜像缓存，多个客户端共享一次总线读取的结果"""
+    
+    def __init__(self):
+        self._values = {}  # 地址 -> (寄存器值, 时间戳)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
     
     @staticmethod
-    def registers_to_float(registers):
-        """将两个16位寄存器转换为浮点数"""
-        if len(registers) != 2:
-            raise ValueError("需要2个寄存器值来转换为浮点数")
+    def ttl_for(address: int) -> float:
+        """获取寄存器的缓存有效期，以寄存器映射为准，映射之外的地址按区段划分"""
+        ttl = REGISTER_TTL.get(address)
+        return default_ttl(address) if ttl is None else ttl
+    
+    def get(self, address: int, count: int):
+        """读取一段连续寄存器，任一寄存器缺失或过期时返回None"""
+        now = time.monotonic()
+        with self._lock:
+            registers = []
+            for addr in range(address, address + count):
+                entry = self._values.get(addr)
+                if entry is None or now - entry[1] > self.ttl_for(addr):
+                    self.misses += 1
+                    return None
+                registers.append(entry[0])
+            self.hits += 1
+            return registers
+    
+    def put(self, address: int, registers):
+        """写入一段连续寄存器"""
+        now = time.monotonic()
+        with self._lock:
+            for offset, value in enumerate(registers):
+                self._values[address + offset] = (value, now)
+    
+    def invalidate(self, address: int, count: int = 1):
+        """使一段寄存器失效"""
+        with self._lock:
+            for addr in range(address, address + count):
+                self._values.pop(addr, None)
+    
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._values.clear()
+    
+    def stats(self):
+        """获取缓存命中统计"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else None,
+                "entries": len(self._values)
+            }
+
+register_cache = RegisterCache()
+
+def update_cache_after_write(address: int, registers, success: bool):
+    """写入后更新或失效缓存"""
+    if success and address not in COMMAND_REGISTERS:
+        register_cache.put(address, registers)
+    else:
+        register_cache.invalidate(address, len(registers))
+    # 控制区写入会改变运动反馈，使实时反馈寄存器失效
+    if address < 0x40:
+        register_cache.invalidate(0x40, 0x10)
+
+bus_metrics = BusMetrics()
+
+class InstrumentedSlave:
+    """包装SDK的slave，为每次读写记录总线指标"""
+    
+    def __init__(self, slave, metrics: BusMetrics):
+        self._slave = slave
+        self._metrics = metrics
+    
+    def read_holding_regs(self, address: int, count: int):
+        return self._metrics.call("read", address, count, self._slave.read_holding_regs, address, count)
+    
+    def write_holding_regs(self, address: int, registers):
+        return self._metrics.call("write", address, len(registers), self._slave.write_holding_regs, address, registers)
+
+class ControllerSession:
+    """
+    机械臂控制器会话
+    
+    Modbus通信和数字输出控制共用同一个Arm连接。各使用方通过acquire/release登记，
+    最后一个使用方释放时才断开；SDK调用异常时标记为失效，下次acquire重新握手。
+    """
+    
+    def __init__(self, ip: str):
+        self.ip = ip
+        self.arm = None
+        self.health = "未连接"
+        self.handshakes = 0  # 累计建立连接次数
+        self._holders = set()
+        self._lock = threading.Lock()
+    
+    def acquire(self, holder: str):
+        """
+        登记使用方并返回已连接的Arm实例，未连接或已失效时重新连接
         
-        high_word = registers[0]
-        low_word = registers[1]
-        packed = struct.pack('>HH', high_word, low_word)
-        float_value = struct.unpack('>f', packed)[0]
-        return float_value
+        Raises:
+            ConnectionError: 连接失败
+        """
+        with self._lock:
+            if self.arm is None:
+                arm = Arm()
+                ret = arm.connect(self.ip)
+                self.handshakes += 1
+                if ret != StatusCodeEnum.OK:
+                    self.health = "连接失败"
+                    raise ConnectionError(f"机械臂连接失败: {ret.errmsg}")
+                self.arm = arm
+                self.health = "已连接"
+                logger.info(f"控制器{self.ip}连接成功")
+            self._holders.add(holder)
+            return self.arm
+    
+    def release(self, holder: str):
+        """注销使用方，没有使用方时断开连接"""
+        with self._lock:
+            self._holders.discard(holder)
+            if not self._holders:
+                self._close()
+    
+    def mark_failed(self, reason: str):
+        """SDK调用异常时标记连接失效，所有使用方下次acquire时重新连接"""
+        with self._lock:
+            logger.warning(f"控制器连接失效: {reason}")
+            self._close()
+            self.health = "连接失效"
+    
+    def _close(self):
+        if self.arm is not None:
+            try:
+                self.arm.disconnect()
+            except Exception as e:
+                logger.warning(f"断开控制器连接异常: {e}")
+            self.arm = None
+        self.health = "未连接"
+    
+    def status(self):
+        """获取会话状态"""
+        with self._lock:
+            return {
+                "ip": self.ip,
+                "health": self.health,
+                "holders": sorted(self._holders),
+                "handshakes": self.handshakes
+            }
+
+controller_session = ControllerSession(CONTROLLER_IP)
+
+# 重连退避参数
+RECONNECT_BASE_DELAY = 1.0  # 首次重连等待(秒)
+RECONNECT_MAX_DELAY = 30.0  # 单次重连等待上限(秒)
+RECONNECT_JITTER = 0.3  # 等待时间的随机抖动比例
+RECONNECT_FAILURE_THRESHOLD = 5  # 连续失败多少次后熔断
+RECONNECT_OPEN_DURATION = 60.0  # 熔断持续时间(秒)
+RECONNECT_FAST_PATH_ATTEMPTS = 2  # 连续失败少于该次数时优先只恢复从站
+
+class ReconnectSupervisor:
+    """
+    重连监督器
+    
+    连续失败时按指数退避(带随机抖动)推迟下一次重连；连续失败达到阈值后熔断，
+    熔断期间不再尝试，到期后进入半开状态只放行一次试探，成功则恢复，失败则再次熔断。
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, base_delay: float = RECONNECT_BASE_DELAY, max_delay: float = RECONNECT_MAX_DELAY,
+                 jitter: float = RECONNECT_JITTER, failure_threshold: int = RECONNECT_FAILURE_THRESHOLD,
+                 open_duration: float = RECONNECT_OPEN_DURATION):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.failure_threshold = failure_threshold
+        self.open_duration = open_duration
+        self.state = self.CLOSED
+        self.failures = 0  # 连续失败次数
+        self.total_attempts = 0
+        self.trips = 0  # 累计熔断次数
+        self.last_error = None
+        self._next_attempt = 0.0  # 下一次允许重连的时间(monotonic)
+        self._next_attempt_wall = None
+    
+    def ready(self) -> bool:
+        """当前是否允许发起重连"""
+        if time.monotonic() < self._next_attempt:
+            return False
+        if self.state == self.OPEN:
+            self.state = self.HALF_OPEN
+            logger.info("重连熔断到期，进入半开状态试探连接")
+        return True
+    
+    def wait_time(self) -> float:
+        """距离下一次允许重连的秒数"""
+        return max(0.0, self._next_attempt - time.monotonic())
+    
+    def record_attempt(self):
+        self.total_attempts += 1
+    
+    def record_success(self):
+        if self.state != self.CLOSED or self.failures:
+            logger.info(f"重连成功，累计失败{self.failures}次后恢复")
+        self.state = self.CLOSED
+        self.failures = 0
+        self.last_error = None
+        self._schedule(0.0)
+    
+    def record_failure(self, reason: str):
+        self.failures += 1
+        self.last_error = reason
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.trips += 1
+            self._schedule(self.open_duration)
+            logger.warning(f"重连连续失败{self.failures}次，熔断{self.open_duration:.0f}秒: {reason}")
+        else:
+            delay = min(self.max_delay, self.base_delay * (2 ** (self.failures - 1)))
+            delay *= 1 + random.uniform(-self.jitter, self.jitter)
+            self._schedule(delay)
+            logger.warning(f"重连失败({self.failures}/{self.failure_threshold})，{delay:.1f}秒后重试: {reason}")
+    
+    def reset(self):
+        """手动复位，立即允许重连"""
+        self.state = self.CLOSED
+        self.failures = 0
+        self._schedule(0.0)
+    
+    def _schedule(self, delay: float):
+        self._next_attempt = time.monotonic() + delay
+        self._next_attempt_wall = datetime.fromtimestamp(time.time() + delay).isoformat() if delay > 0 else None
+    
+    def status(self):
+        """获取监督器状态"""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "failure_threshold": self.failure_threshold,
+            "total_attempts": self.total_attempts,
+            "trips": self.trips,
+            "next_attempt_at": self._next_attempt_wall,
+            "last_error": self.last_error
+        }
+
+reconnect_supervisor = ReconnectSupervisor()
+modbus_params_arm = None  # 已设置过Modbus参数的Arm实例，用于判断能否走快速恢复
 
 def connect_robot():
     """连接机械臂"""
-    global arm_connection, slave_instance, connection_status, modbus_status, reconnect_attempts
+    global slave_instance, connection_status, modbus_status, modbus_params_arm
     try:
-        arm_connection = Arm()
-        ret = arm_connection.connect("10.27.1.254")
+        try:
+            arm = controller_session.acquire("modbus")
+        except ConnectionError as e:
+            connection_status = "连接失败"
+            modbus_status = "机械臂连接失败"
+            return False, f"机器人连接失败: {str(e)}"
         
-        if ret == StatusCodeEnum.OK:
-            # 设置Modbus参数
-            params = SerialParams(
-                channel=ModbusChannel.WRIST_485_0, 
-                ip="", 
-                port=502, 
-                baud=115200, 
-                data_bit=8, 
-                stop_bit=1, 
-                parity=ModbusParity.NONE, 
-                timeout=500
-            )
-            id, ret_code = arm_connection.modbus.set_parameter(params)
-            
-            if ret_code == StatusCodeEnum.OK:
-                slave_instance = arm_connection.modbus.get_slave(ModbusChannel.WRIST_485_0, 1, 1)
-                time.sleep(1)
-                connection_status = "已连接"
-                modbus_status = "已连接"
-                reconnect_attempts = 0  # 重置重连计数
-                return True, "机器人连接成功"
-            else:
-                connection_status = "连接失败"
-                modbus_status = "Modbus参数设置失败"
-                return False, f"设置Modbus参数失败: {ret_code.errmsg}"
+        # 设置Modbus参数
+        params = SerialParams(
+            channel=ModbusChannel.WRIST_485_0, 
+            ip="", 
+            port=502, 
+            baud=115200, 
+            data_bit=8, 
+            stop_bit=1, 
+            parity=ModbusParity.NONE, 
+            timeout=500
+        )
+        id, ret_code = arm.modbus.set_parameter(params)
+        
+        if ret_code == StatusCodeEnum.OK:
+            slave_instance = InstrumentedSlave(arm.modbus.get_slave(ModbusChannel.WRIST_485_0, 1, 1), bus_metrics)
+            modbus_params_arm = arm
+            register_cache.clear()
+            # 重新建立连接后控制器侧输出状态未知，指示输出需重新下发
+            reset_indicator_state()
+            connection_status = "已连接"
+            modbus_status = "已连接"
+            return True, "机器人连接成功"
         else:
+            # 控制器拒绝设置参数时下次重连重新握手
+            controller_session.mark_failed(ret_code.errmsg)
             connection_status = "连接失败"
-            modbus_status = "机械臂连接失败"
-            return False, f"机器人连接失败: {ret.errmsg}"
+            modbus_status = "Modbus参数设置失败"
+            return False, f"设置Modbus参数失败: {ret_code.errmsg}"
             
     except Exception as e:
+        controller_session.mark_failed(str(e))
         connection_status = "连接异常"
         modbus_status = f"连接异常: {str(e)}"
         return False, f"连接过程中发生异常: {str(e)}"
 
 def disconnect_robot():
     """断开机械臂连接"""
-    global arm_connection, slave_instance, connection_status, modbus_status
-    if arm_connection:
-        arm_connection.disconnect()
-    arm_connection = None
+    global slave_instance, connection_status, modbus_status
+    controller_session.release("modbus")
     slave_instance = None
+    register_cache.clear()
     connection_status = "未连接"
     modbus_status = "未连接"
     return True, "已断开连接"
 
+def reconnect_robot(full: bool = False):
+    """
+    恢复Modbus连接
+    
+    控制器连接仍然有效且已设置过串口参数时，只重新获取从站并探测，不重新设置SerialParams；
+    否则或full为True时走完整的connect_robot流程。
+    """
+    global slave_instance, connection_status
+    arm = controller_session.arm
+    if not full and arm is not None and arm is modbus_params_arm:
+        try:
+            recovered = slave_instance is not None and probe_modbus_connection()
+            if not recovered:
+                # 原从站无响应时重新获取从站，只对新从站再探测一次
+                slave_instance = InstrumentedSlave(arm.modbus.get_slave(ModbusChannel.WRIST_485_0, 1, 1), bus_metrics)
+                register_cache.clear()
+                recovered = probe_modbus_connection()
+            if recovered:
+                connection_status = "已连接"
+                return True, "Modbus从站已恢复响应"
+        except Exception as e:
+            controller_session.mark_failed(str(e))
+            return False, f"Modbus恢复异常: {str(e)}"
+        return False, f"Modbus从站无响应: {modbus_status}"
+    
+    return connect_robot()
+
 def set_digital_output(output_number: int, value: int):
     """设置数字输出状态"""
-    global arm_instance
-    
     try:
-        if not arm_instance:
-            # 初始化机械臂连接
-            arm_instance = Arm()
-            ret = arm_instance.connect("10.27.1.254")
-            if ret != StatusCodeEnum.OK:
-                return False, f"机械臂连接失败: {ret.errmsg}"
+        try:
+            arm = controller_session.acquire("io")
+        except ConnectionError as e:
+            return False, str(e)
         
         # 设置数字输出
         signal_value = SignalValue.ON if value == 1 else SignalValue.OFF
-        ret = arm_instance.signals.write(SignalType.DO, output_number, signal_value)
+        ret = arm.signals.write(SignalType.DO, output_number, signal_value)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"数字输出{output_number}设置为{value}")
+            digital_output_state[output_number] = 1 if value == 1 else 0
+            logger.debug(f"数字输出{output_number}设置为{value}")
             return True, f"数字输出{output_number}设置为{value}"
         else:
             return False, f"设置数字输出失败: {ret.errmsg}"
             
     except Exception as e:
+        controller_session.mark_failed(str(e))
         return False, f"设置数字输出异常: {str(e)}"
 
+def get_digital_output(output_number: int):
+    """读取数字输出状态"""
+    try:
+        try:
+            arm = controller_session.acquire("io")
+        except ConnectionError:
+            return False, "无法连接到机械臂", None
+        
+        do_value, ret = arm.signals.read(SignalType.DO, output_number)
+        if ret == StatusCodeEnum.OK:
+            value = 1 if do_value == SignalValue.ON else 0
+            digital_output_state[output_number] = value
+            return True, f"读取数字输出{output_number}成功", value
+        else:
+            return False, f"读取数字输出失败: {ret.errmsg}", None
+            
+    except Exception as e:
+        controller_session.mark_failed(str(e))
+        return False, f"读取数字输出异常: {str(e)}", None
+
+DIGITAL_OUTPUT_COUNT = 16
+digital_output_state = {}  # 编号 -> 最近一次读写得到的值，用于拼出完整位图
+
+def parse_output_numbers(spec: Optional[str]) -> list:
+    """
+    解析数字输出编号，支持"1,3,5-8"格式，为空或"all"时表示全部
+    
+    Raises:
+        ValueError: 格式错误或编号超出1-16
+    """
+    if spec is None or spec.strip() in ("", "all"):
+        return list(range(1, DIGITAL_OUTPUT_COUNT + 1))
+    outputs = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            if "-" in item:
+                first, last = (int(part) for part in item.split("-", 1))
+                outputs.extend(range(first, last + 1) if first <= last else range(first, last - 1, -1))
+            else:
+                outputs.append(int(item))
+        except ValueError:
+            raise ValueError("数字输出编号格式错误，应为逗号分隔的整数或范围(如1,3,5-8)")
+    outputs = sorted(set(outputs))
+    if not outputs:
+        raise ValueError("至少需要指定一个数字输出")
+    if outputs[0] < 1 or outputs[-1] > DIGITAL_OUTPUT_COUNT:
+        raise ValueError(f"数字输出编号范围应为1-{DIGITAL_OUTPUT_COUNT}")
+    return outputs
+
+def digital_output_bitmap():
+    """
+    由最近的读写结果拼出数字输出位图
+    
+    Returns:
+        tuple: (位图, 已知位掩码)，第n号输出对应第n-1位
+    """
+    bitmap = mask = 0
+    for output_number, value in digital_output_state.items():
+        mask |= 1 << (output_number - 1)
+        if value:
+            bitmap |= 1 << (output_number - 1)
+    return bitmap, mask
+
+async def read_digital_outputs(output_numbers: list):
+    """
+    读取多个数字输出
+    
+    SDK只提供单点读取，每个输出作为独立的总线任务提交，运动命令最多等待一次读取；
+    排队中的相同读取会被合并。遇到错误立即停止。
+    
+    Returns:
+        tuple: (是否成功, 提示信息, {编号: 值})
+    """
+    values = {}
+    for output_number in output_numbers:
+        success, message, value = await run_on_bus(get_digital_output, output_number)
+        if not success:
+            return False, message, values
+        values[output_number] = value
+    return True, f"读取{len(values)}个数字输出成功", values
+
+async def write_digital_outputs(targets: dict, skip_unchanged: bool = False):
+    """
+    设置多个数字输出，每个输出作为独立的总线任务提交
+    
+    Args:
+        targets: {编号: 0或1}
+        skip_unchanged: 为True时先读取目标端口，只写入需要变化的端口
+    
+    Returns:
+        tuple: (是否成功, 提示信息, 实际写入的编号列表)
+    """
+    current = {}
+    if skip_unchanged:
+        success, message, current = await read_digital_outputs(sorted(targets))
+        if not success:
+            return False, message, []
+    
+    written = []
+    for output_number in sorted(targets):
+        value = targets[output_number]
+        if current.get(output_number) == value:
+            continue
+        success, message = await run_on_bus(set_digital_output, output_number, value, priority=PRIORITY_WRITE)
+        if not success:
+            return False, message, written
+        written.append(output_number)
+    return True, f"设置{len(targets)}个数字输出成功，实际写入{len(written)}个", written
+
 def disconnect_arm():
-    """断开机械臂连接（用于数字输出控制）"""
-    global arm_instance
-    if arm_instance:
-        arm_instance.disconnect()
-        arm_instance = None
-        logger.info("数字输出控制连接已断开")
+    """释放数字输出控制对机械臂连接的占用"""
+    controller_session.release("io")
+    logger.info("数字输出控制连接已释放")
 
 async def check_modbus_connection():
     """检查Modbus连接状态"""
+    try:
+        return await run_on_bus(probe_modbus_connection, priority=PRIORITY_POLL)
+    except BusJobExpired:
+        # 总线忙于更高优先级的任务，本次不做判断，沿用上次结果
+        return modbus_connected
+
+def probe_modbus_connection():
+    """读取夹爪ID寄存器探测Modbus连接状态(阻塞调用，需在总线执行器中运行)"""
     global modbus_status, slave_instance, last_modbus_check, modbus_connected, last_modbus_check_success
     
     if not slave_instance:
@@ -168,7 +720,7 @@ async def check_modbus_connection():
     try:
         # 尝试读取一个简单的寄存器来测试Modbus连接
         start_time = time.time()
-        registers, status = slave_instance.read_holding_regs(0x80, 1)
+        registers, status = slave_instance.read_holding_regs(REGISTERS["gripper_id"].address, 1)
         response_time = int((time.time() - start_time) * 1000)  # 计算响应时间
         
         last_modbus_check = datetime.now().isoformat()
@@ -197,6 +749,47 @@ async def check_modbus_connection():
 
 
 
+async def update_indicator_outputs(modbus_ok: bool):
+    """按Modbus状态驱动指示数字输出，仅在状态变化或到达重新下发间隔时写入"""
+    now = time.monotonic()
+    for output_number in list(indicator_outputs):
+        last_value = indicator_state.get(output_number)
+        if not modbus_ok:
+            value = 0
+        elif indicator_pattern == "pulse":
+            value = 0 if last_value == 1 else 1
+        else:
+            value = 1
+        
+        changed = value != last_value
+        if not changed and now - indicator_last_assert.get(output_number, 0) < INDICATOR_REASSERT_INTERVAL:
+            continue
+        
+        try:
+            success, message = await run_on_bus(set_digital_output, output_number, value, priority=PRIORITY_WRITE)
+        except BusJobExpired:
+            success, message = False, "总线繁忙，任务排队超时"
+        if not success:
+            # 写入失败时清除记录，下个周期重新下发
+            indicator_state.pop(output_number, None)
+            logger.warning(f"设置数字输出{output_number}失败: {message}")
+            continue
+        
+        indicator_state[output_number] = value
+        indicator_last_assert[output_number] = now
+        # 脉冲模式每周期都会翻转，只记录连接状态变化
+        if changed and (indicator_pattern != "pulse" or last_value is None or not modbus_ok):
+            logger.info(f"Modbus{'已连接' if modbus_ok else '未连接'}，数字输出{output_number}设置为{'ON' if value else 'OFF'}")
+
+def reset_indicator_state(output_number: Optional[int] = None):
+    """清除指示输出的下发记录，使下个心跳周期重新写入"""
+    if output_number is None:
+        indicator_state.clear()
+        indicator_last_assert.clear()
+    else:
+        indicator_state.pop(output_number, None)
+        indicator_last_assert.pop(output_number, None)
+
 async def check_connection_status():
     """检查连接状态"""
     global connection_status, modbus_status, modbus_connected
@@ -205,46 +798,39 @@ async def check_connection_status():
         if connection_status == "已连接":
             # 检查Modbus连接状态
             modbus_ok = await check_modbus_connection()
+            # Modbus已连接时点亮指示输出，未连接时熄灭
+            await update_indicator_outputs(modbus_ok)
             
-            if modbus_ok:
-                # Modbus已连接，设置选定的数字输出为1
-                success, message = set_digital_output(selected_digital_output, 1)
-                if success:
-                    logger.info(f"Modbus已连接，数字输出{selected_digital_output}设置为ON")
-                else:
-                    logger.warning(f"设置数字输出{selected_digital_output}失败: {message}")
-            else:
-                # Modbus未连接，设置选定的数字输出为0
-                success, message = set_digital_output(selected_digital_output, 0)
-                if success:
-                    logger.info(f"Modbus未连接，数字输出{selected_digital_output}设置为OFF")
-                else:
-                    logger.warning(f"设置数字输出{selected_digital_output}失败: {message}")
-                
+            if not modbus_ok:
                 connection_status = "Modbus连接异常"
                 modbus_connected = False
         
-        # 如果连接丢失且未达到最大重连次数，则尝试重连
-        if connection_status in ["未连接", "连接失败", "连接异常", "Modbus连接异常", "连接丢失"]:
-            global reconnect_attempts
-            if reconnect_attempts < max_reconnect_attempts:
-                logger.info(f"尝试重连机械臂，第 {reconnect_attempts + 1} 次")
-                loop = asyncio.get_event_loop()
-                success, message = await loop.run_in_executor(None, connect_robot)
-                if success:
-                    # 连接成功后立即检查Modbus状态
-                    await check_modbus_connection()
-                    reconnect_attempts = 0
-                else:
-                    logger.warning(f"重连失败: {message}")
-                    reconnect_attempts += 1
+        # 连接丢失时由重连监督器决定是否发起重连
+        disconnected = connection_status in ["未连接", "连接失败", "连接异常", "Modbus连接异常", "连接丢失"]
+        if disconnected and reconnect_supervisor.ready():
+            reconnect_supervisor.record_attempt()
+            logger.info(f"尝试重连机械臂，第 {reconnect_supervisor.failures + 1} 次")
+            try:
+                # 快速恢复连续失败后改为完整重连，防止控制器重启后串口参数丢失
+                full = reconnect_supervisor.failures >= RECONNECT_FAST_PATH_ATTEMPTS
+                success, message = await run_on_bus(reconnect_robot, full, priority=PRIORITY_WRITE)
+            except BusJobExpired:
+                success, message = False, "总线繁忙，重连任务超时"
+            if success:
+                # 连接成功后立即检查Modbus状态
+                success = await check_modbus_connection()
+                message = modbus_status
+            if success:
+                reconnect_supervisor.record_success()
+                disconnected = False
             else:
-                logger.warning(f"已达到最大重连次数 ({max_reconnect_attempts}次)，将在{reconnect_interval}秒后再次尝试")
-                await asyncio.sleep(reconnect_interval)
-                reconnect_attempts = 0  # 重置重连计数以便下次尝试
+                reconnect_supervisor.record_failure(message)
         
-        # 每3秒检查一次连接状态
-        await asyncio.sleep(3)
+        # 断线时按退避时间唤醒，最长不超过一个心跳周期
+        if disconnected:
+            await asyncio.sleep(min(HEARTBEAT_INTERVAL, max(0.1, reconnect_supervisor.wait_time())))
+        else:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
 
 def write_float_registers(address: int, float_value: float):
     """写入浮点数到寄存器"""
@@ -256,8 +842,10 @@ def write_float_registers(address: int, float_value: float):
     try:
         registers = ModbusHelper.float_to_registers(float_value)
         result = slave_instance.write_holding_regs(address, registers)
+        update_cache_after_write(address, registers, result == StatusCodeEnum.OK)
         return result == StatusCodeEnum.OK, f"写入浮点数到寄存器{address}: {float_value:.6f}"
     except Exception as e:
+        register_cache.invalidate(address, 2)
         modbus_connected = False  # 发生异常时标记为未连接
         return False, f"写入浮点数失败: {str(e)}"
 
@@ -274,8 +862,10 @@ def write_int_register(address: int, int_value: int):
             int_value = max(0, min(int_value, 65535))
         
         result = slave_instance.write_holding_regs(address, [int_value])
+        update_cache_after_write(address, [int_value], result == StatusCodeEnum.OK)
         return result == StatusCodeEnum.OK, f"写入整数到寄存器{address}: {int_value}"
     except Exception as e:
+        register_cache.invalidate(address, 1)
         modbus_connected = False  # 发生异常时标记为未连接
         return False, f"写入整数失败: {str(e)}"
 
@@ -286,9 +876,14 @@ def read_float_registers(address: int):
     if not slave_instance or not modbus_connected:
         return False, "Modbus未连接，无法读取", None
     
+    cached = register_cache.get(address, 2)
+    if cached is not None:
+        return True, f"读取寄存器{address}成功(缓存)", ModbusHelper.registers_to_float(cached)
+    
     try:
         registers, status = slave_instance.read_holding_regs(address, 2)
         if status == StatusCodeEnum.OK and len(registers) == 2:
+            register_cache.put(address, registers)
             float_value = ModbusHelper.registers_to_float(registers)
             return True, f"读取寄存器{address}成功", float_value
         else:
@@ -305,9 +900,14 @@ def read_int_register(address: int):
     if not slave_instance or not modbus_connected:
         return False, "Modbus未连接，无法读取", None
     
+    cached = register_cache.get(address, 1)
+    if cached is not None:
+        return True, f"读取寄存器{address}成功(缓存)", cached[0]
+    
     try:
         registers, status = slave_instance.read_holding_regs(address, 1)
         if status == StatusCodeEnum.OK and len(registers) >= 1:
+            register_cache.put(address, registers[:1])
             int_value = registers[0]
             return True, f"读取寄存器{address}成功", int_value
         else:
@@ -317,18 +917,60 @@ def read_int_register(address: int):
         modbus_connected = False  # 发生异常时标记为未连接
         return False, f"读取整数失败: {str(e)}", None
 
+def read_register_block(address: int, count: int):
+    """从寄存器连续读取一段原始数据"""
+    global modbus_connected
+    
+    if not slave_instance or not modbus_connected:
+        return False, "Modbus未连接，无法读取", None
+    
+    cached = register_cache.get(address, count)
+    if cached is not None:
+        return True, f"读取寄存器{address}-{address + count - 1}成功(缓存)", cached
+    
+    try:
+        registers, status = slave_instance.read_holding_regs(address, count)
+        if status == StatusCodeEnum.OK and len(registers) == count:
+            register_cache.put(address, registers)
+            return True, f"读取寄存器{address}-{address + count - 1}成功", list(registers)
+        else:
+            modbus_connected = False  # 读取失败时标记为未连接
+            return False, f"读取寄存器失败: {status}", None
+    except Exception as e:
+        modbus_connected = False  # 发生异常时标记为未连接
+        return False, f"读取寄存器块失败: {str(e)}", None
+
+# 各数据类型占用的寄存器数量
+REGISTER_WIDTH = {"int": 1, "float": 2}
+MAX_BLOCK_GAP = 2  # 块合并时允许跨越的最大空闲寄存器数
+MAX_BLOCK_SIZE = 64  # 单次块读取的最大寄存器数(Modbus上限为125)
+
+def plan_block_reads(fields, max_gap: int = MAX_BLOCK_GAP, max_size: int = MAX_BLOCK_SIZE):
+    """
+    将字段表合并为最少的连续块读取
+    
+    Args:
+        fields: [(名称, 地址, 类型)] 字段表，类型为"int"或"float"
+        max_gap: 相邻字段之间允许合并的最大空闲寄存器数
+        max_size: 单个块的最大寄存器数
+    
+    Returns:
+        [(起始地址, 寄存器数量, [(名称, 地址, 类型)])] 块读取计划
+    """
+    blocks = []
+    for field in sorted(fields, key=lambda f: f[1]):
+        name, address, kind = field
+        end = address + REGISTER_WIDTH[kind]
+        if blocks:
+            start, stop, members = blocks[-1]
+            if address - stop <= max_gap and max(stop, end) - start <= max_size:
+                blocks[-1] = (start, max(stop, end), members + [field])
+                continue
+        blocks.append((address, end, [field]))
+    return [(start, stop - start, members) for start, stop, members in blocks]
+
 
 
-# 波特率映射字典
-BAUD_RATE_MAP = {
-    0: 9600,
-    1: 19200,
-    2: 38400,
-    3: 57600,
-    4: 115200,
-    5: 153600,
-    6: 256000
-}
 
 REVERSE_BAUD_MAP = {v: k for k, v in BAUD_RATE_MAP.items()}
 
@@ -351,14 +993,23 @@ async def get_connection_status():
         "status": connection_status,
         "modbus_status": modbus_status,
         "last_modbus_check": last_modbus_check,
-        "attempts": reconnect_attempts,
-        "max_attempts": max_reconnect_attempts
+        "attempts": reconnect_supervisor.failures,
+        "max_attempts": reconnect_supervisor.failure_threshold,
+        "reconnect": reconnect_supervisor.status(),
+        "controller": controller_session.status()
     }
 
+@app.post("/reset_reconnect")
+async def reset_reconnect_endpoint():
+    """复位重连熔断，下个心跳周期立即重连"""
+    reconnect_supervisor.reset()
+    logger.info("重连监督器已手动复位")
+    return {"success": True, "message": "重连熔断已复位", "reconnect": reconnect_supervisor.status()}
+
 @app.post("/disconnect")
 async def disconnect_endpoint():
     """断开机械臂连接"""
-    success, message = disconnect_robot()
+    success, message = await run_on_bus(disconnect_robot, priority=PRIORITY_WRITE)
     return {"success": success, "message": message}
 
 # 单独的Modbus状态检查接口
@@ -383,7 +1034,12 @@ async def set_digital_output_endpoint(output_number: int = Form(...), value: int
     if value not in [0, 1]:
         return {"success": False, "message": "输出值应为0或1"}
     
-    success, message = set_digital_output(output_number, value)
+    success, message = await run_on_bus(set_digital_output, output_number, value, priority=PRIORITY_WRITE)
+    if success:
+        logger.info(message)
+    if output_number in indicator_outputs:
+        # 手动修改了指示输出，下个心跳周期按连接状态重新下发
+        reset_indicator_state(output_number)
     return {"success": success, "message": message}
 
 @app.get("/get_digital_output")
@@ -392,39 +1048,128 @@ async def get_digital_output_endpoint(output_number: int):
     if output_number < 1 or output_number > 16:
         return {"success": False, "message": "数字输出编号范围应为1-16"}
     
-    try:
-        if not arm_instance:
-            # 如果没有连接，尝试连接
-            success, message = set_digital_output(output_number, 0)
-            if not success:
-                return {"success": False, "message": "无法连接到机械臂"}
-        
-        # 读取数字输出状态
-        do_value, ret = arm_instance.signals.read(SignalType.DO, output_number)
-        if ret == StatusCodeEnum.OK:
-            status = 1 if do_value == SignalValue.ON else 0
-            return {"success": True, "value": status, "status_text": "ON" if status == 1 else "OFF"}
-        else:
-            return {"success": False, "message": f"读取数字输出失败: {ret.errmsg}"}
-            
-    except Exception as e:
-        return {"success": False, "message": f"读取数字输出异常: {str(e)}"}
+    success, message, value = await run_on_bus(get_digital_output, output_number)
+    if success:
+        return {"success": True, "value": value, "status_text": "ON" if value == 1 else "OFF"}
+    return {"success": False, "message": message}
 
+def digital_outputs_response(success: bool, message: str, values: dict, **extra) -> dict:
+    bitmap, mask = digital_output_bitmap()
+    return {
+        "success": success,
+        "message": message,
+        "values": {str(n): v for n, v in values.items()},
+        "bitmap": bitmap,
+        "mask": mask,
+        **extra
+    }
+
+@app.get("/get_digital_outputs")
+async def get_digital_outputs_endpoint(outputs: Optional[str] = None):
+    """
+    批量读取数字输出
+    
+    outputs为"1,3,5-8"格式，省略时读取全部16个。返回的bitmap中第n号输出对应第n-1位，
+    mask标出位图中已知状态的位。
+    """
+    try:
+        output_numbers = parse_output_numbers(outputs)
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    
+    success, message, values = await read_digital_outputs(output_numbers)
+    return digital_outputs_response(success, message, values)
+
+@app.post("/set_digital_outputs")
+async def set_digital_outputs_endpoint(
+    outputs: Optional[str] = Form(None),
+    value: Optional[int] = Form(None),
+    bitmap: Optional[int] = Form(None),
+    mask: Optional[int] = Form(None),
+    skip_unchanged: int = Form(0)
+):
+    """
+    批量设置数字输出
+    
+    两种用法: outputs(如"1-4,9")加value把这些端口设为同一个值；或bitmap加mask，
+    把mask中置位的端口设为bitmap对应位的值，mask省略时为全部16位。
+    skip_unchanged=1时先读取这些端口，只写入需要变化的端口。
+    """
+    if bitmap is not None:
+        full_mask = (1 << DIGITAL_OUTPUT_COUNT) - 1
+        mask = full_mask if mask is None else mask
+        if bitmap < 0 or bitmap > full_mask or mask < 0 or mask > full_mask:
+            return {"success": False, "message": f"bitmap和mask应在0-{full_mask}之间"}
+        targets = {n: (bitmap >> (n - 1)) & 1 for n in range(1, DIGITAL_OUTPUT_COUNT + 1) if mask >> (n - 1) & 1}
+    elif value is not None:
+        if value not in [0, 1]:
+            return {"success": False, "message": "输出值应为0或1"}
+        try:
+            targets = {n: value for n in parse_output_numbers(outputs)}
+        except ValueError as e:
+            return {"success": False, "message": str(e)}
+    else:
+        return {"success": False, "message": "需要提供value或bitmap"}
+    
+    if not targets:
+        return {"success": False, "message": "至少需要指定一个数字输出"}
+    
+    success, message, written = await write_digital_outputs(targets, bool(skip_unchanged))
+    if written:
+        logger.info(f"批量设置数字输出{','.join(str(n) for n in written)}: {message}")
+    for output_number in written:
+        if output_number in indicator_outputs:
+            reset_indicator_state(output_number)
+    values = {n: digital_output_state[n] for n in targets if n in digital_output_state}
+    return digital_outputs_response(success, message, values, written=written)
 
 @app.post("/set_modbus_indicator_digital_output")
-async def set_modbus_indicator_digital_output(output_number: int = Form(...)):
-    """设置用于Modbus连接状态指示的数字输出端口"""
-    global selected_digital_output
+async def set_modbus_indicator_digital_output(
+    output_number: Optional[int] = Form(None),
+    output_numbers: Optional[str] = Form(None),
+    pattern: Optional[str] = Form(None)
+):
+    """设置用于Modbus连接状态指示的数字输出端口
+
+    output_numbers为逗号分隔的多个端口(如"1,3")，pattern为steady或pulse
+    """
+    global indicator_outputs, indicator_pattern
     
-    if output_number < 1 or output_number > 16:
+    if output_numbers:
+        try:
+            outputs = [int(item) for item in output_numbers.split(",") if item.strip()]
+        except ValueError:
+            return {"success": False, "message": "数字输出编号格式错误，应为逗号分隔的整数"}
+    elif output_number is not None:
+        outputs = [output_number]
+    else:
+        outputs = list(indicator_outputs)
+    
+    outputs = list(dict.fromkeys(outputs))
+    if not outputs:
+        return {"success": False, "message": "至少需要指定一个数字输出"}
+    if any(n < 1 or n > 16 for n in outputs):
         return {"success": False, "message": "数字输出编号范围应为1-16"}
     
-    selected_digital_output = output_number
-    logger.info(f"设置Modbus连接状态指示器为数字输出{output_number}")
+    if pattern is not None and pattern not in INDICATOR_PATTERNS:
+        return {"success": False, "message": f"指示模式应为: {', '.join(INDICATOR_PATTERNS)}"}
+    
+    # 不再作为指示器的端口熄灭，避免保持旧状态
+    for removed in [n for n in indicator_outputs if n not in outputs]:
+        if indicator_state.get(removed):
+            await run_on_bus(set_digital_output, removed, 0, priority=PRIORITY_WRITE)
+    
+    indicator_outputs = outputs
+    if pattern is not None:
+        indicator_pattern = pattern
+    reset_indicator_state()
+    
+    outputs_text = ",".join(str(n) for n in outputs)
+    logger.info(f"设置Modbus连接状态指示器为数字输出{outputs_text}，模式{indicator_pattern}")
     
     return {
         "success": True, 
-        "message": f"已设置Modbus连接状态指示器为数字输出{output_number}"
+        "message": f"已设置Modbus连接状态指示器为数字输出{outputs_text}"
     }
 
 @app.get("/get_modbus_indicator_digital_output")
@@ -432,7 +1177,9 @@ async def get_modbus_indicator_digital_output():
     """获取当前设置的Modbus连接状态指示数字输出端口"""
     return {
         "success": True, 
-        "output_number": selected_digital_output
+        "output_number": indicator_outputs[0],
+        "output_numbers": indicator_outputs,
+        "pattern": indicator_pattern
     }
 
 
@@ -440,42 +1187,55 @@ async def get_modbus_indicator_digital_output():
 
     
 # 公共部分读写接口
-@app.post("/write_gripper_id")
-async def write_gripper_id(gripper_id: int = Form(...)):
-    """写入夹爪ID (地址0x80)"""
-    if gripper_id < 1 or gripper_id > 247:
-        return {"success": False, "message": "夹爪ID范围应为1-247"}
+def register_field_routes(field: RegisterField):
+    """按寄存器映射为字段生成读/写接口"""
+    address_text = f"0x{field.address:02X}"
     
-    success, message = write_int_register(0x80, gripper_id)
-    return {"success": success, "message": message}
-
-@app.get("/read_gripper_id")
-async def read_gripper_id():
-    """读取夹爪ID (地址0x80)"""
-    success, message, value = read_int_register(0x80)
-    return {"success": success, "message": message, "value": value}
-
-@app.post("/write_baud_rate")
-async def write_baud_rate(baud_rate: int = Form(...)):
-    """写入夹爪波特率 (地址0x81)"""
-    if baud_rate < 0 or baud_rate > 7:
-        return {"success": False, "message": "波特率编号范围应为1-7"}
+    if field.read_route:
+        reader = read_float_registers if field.kind == "float" else read_int_register
+        
+        async def read_endpoint():
+            success, message, value = await run_on_bus(reader, field.address)
+            result = {"success": success, "message": message, "value": value}
+            if field.status_text is not None:
+                result[field.text_key] = field.text(value)
+            return result
+        
+        read_endpoint.__name__ = field.read_route
+        read_endpoint.__doc__ = f"读取{field.label} (地址{address_text})"
+        app.get(f"/{field.read_route}")(read_endpoint)
     
-    success, message = write_int_register(0x81, baud_rate)
-    return {"success": success, "message": message}
-
-@app.get("/read_baud_rate")
-async def read_baud_rate():
-    """读取夹爪波特率 (地址0x81)"""
-    success, message, value = read_int_register(0x81)
-    baud_value = BAUD_RATE_MAP.get(value, "未知") if value is not None else None
-    return {"success": success, "message": message, "value": value, "baud_value": baud_value}
+    if field.write_route:
+        writer = write_float_registers if field.kind == "float" else write_int_register
+        priority = PRIORITY_MOTION if field.motion else PRIORITY_WRITE
+        
+        async def write_endpoint(**form):
+            value = form[field.param]
+            error = field.validate(value)
+            if error:
+                return {"success": False, "message": error}
+            
+            success, message = await run_on_bus(writer, field.address, value, priority=priority)
+            return {"success": success, "message": message}
+        
+        # 表单参数名和类型来自寄存器映射
+        write_endpoint.__signature__ = inspect.Signature([inspect.Parameter(
+            field.param, inspect.Parameter.KEYWORD_ONLY, default=Form(...),
+            annotation=float if field.kind == "float" else int
+        )])
+        write_endpoint.__name__ = field.write_route
+        write_endpoint.__doc__ = f"写入{field.label} (地址{address_text})"
+        app.post(f"/{field.write_route}")(write_endpoint)
+
+# 寄存器读写接口由寄存器映射生成
+for _field in REGISTER_MAP:
+    register_field_routes(_field)
 
 @app.post("/write_gripper_init")
 async def write_gripper_init(background_tasks: BackgroundTasks):
-    """写入夹爪初始化 (地址0x0) - 写入1后0.5秒写0"""
+    """写入夹爪初始化 (地址0x00) - 写入1后0.5秒写0"""
     # 先写入1
-    success, message = write_int_register(0x0, 1)
+    success, message = await run_on_bus(write_int_register, REGISTERS["gripper_init"].address, 1, priority=PRIORITY_MOTION)
     if not success:
         return {"success": False, "message": message}
     
@@ -483,259 +1243,364 @@ async def write_gripper_init(background_tasks: BackgroundTasks):
     background_tasks.add_task(delayed_write_zero)
     return {"success": True, "message": "夹爪初始化命令已发送，0.5秒后自动复位"}
 
-async def delayed_write_zero():
-    """延迟写入0"""
-    await asyncio.sleep(0.5)
-    write_int_register(0x0, 0)
+# 初始化寄存器复位失败时的最多尝试次数
+INIT_RESET_ATTEMPTS = 3
 
-@app.post("/write_motor_enable")
-async def write_motor_enable(enable: int = Form(...)):
-    """写入电机使能 (地址0x16)"""
-    if enable not in [0, 1]:
-        return {"success": False, "message": "电机使能值应为0或1"}
+async def delayed_write_zero():
+    """延迟写入0，失败(包括总线任务排队超时)时重试，避免初始化寄存器停留在1"""
+    address = REGISTERS["gripper_init"].address
+    for attempt in range(1, INIT_RESET_ATTEMPTS + 1):
+        await asyncio.sleep(0.5)
+        try:
+            success, message = await run_on_bus(write_int_register, address, 0, priority=PRIORITY_MOTION)
+        except BusJobExpired:
+            success, message = False, "总线繁忙，任务排队超时"
+        if success:
+            return
+        logger.warning(f"夹爪初始化寄存器复位失败(第{attempt}次): {message}")
+    logger.error(f"夹爪初始化寄存器0x{address:02X}复位失败，需手动写入0")
+
+# 修改后会改变通信链路的参数，写入后旧ID/波特率上的后续写入都会失败，只能通过各自的接口单独写入
+LINK_FIELDS = ("gripper_id", "baud_rate")
+# 可通过批量配置接口写入的参数: 运动命令、链路参数和除保存参数外的命令寄存器不在其中
+CONFIG_BATCH_FIELDS = {field.name: field for field in REGISTER_MAP
+                       if field.write_route
+                       and not field.motion and field.name not in LINK_FIELDS
+                       and (not field.command or field.name == "save_params")}
+
+def plan_config_writes(changes: dict) -> list:
+    """
+    把参数修改合并为多寄存器写入
     
-    success, message = write_int_register(0x16, enable)
-    return {"success": success, "message": message}
-
-@app.get("/read_motor_enable")
-async def read_motor_enable():
-    """读取电机使能 (地址0x16)"""
-    success, message, value = read_int_register(0x16)
-    return {"success": success, "message": message, "value": value}
-
-@app.post("/write_init_direction")
-async def write_init_direction(direction: int = Form(...)):
-    """写入初始化方向设置 (地址0x82)"""
-    if direction not in [0, 1]:
-        return {"success": False, "message": "初始化方向值应为0或1"}
+    地址相邻的字段合并为一次写入(如0x82-0x84、0x9E-0x9F)，按地址顺序执行；
+    包含保存参数(0x84)的写入排在最后，前面的写入全部成功后才会保存。
     
-    success, message = write_int_register(0x82, direction)
-    return {"success": success, "message": message}
-
-@app.get("/read_init_direction")
-async def read_init_direction():
-    """读取初始化方向设置 (地址0x82)"""
-    success, message, value = read_int_register(0x82)
-    return {"success": success, "message": message, "value": value}
+    Returns:
+        list: 写入组列表，每组为[(字段, 值), ...]
+    """
+    groups = []
+    for field in sorted((CONFIG_BATCH_FIELDS[name] for name in changes), key=lambda f: f.address):
+        last = groups[-1][-1][0] if groups else None
+        if last is not None and last.address + last.width == field.address:
+            groups[-1].append((field, changes[field.name]))
+        else:
+            groups.append([(field, changes[field.name])])
+    groups.sort(key=lambda group: any(field.name == "save_params" for field, _ in group))
+    return groups
 
-@app.post("/write_auto_init")
-async def write_auto_init(auto_init: int = Form(...)):
-    """写入自动初始化设置 (地址0x83)"""
-    if auto_init not in [0, 1]:
-        return {"success": False, "message": "自动初始化值应为0或1"}
+def write_config_groups(groups: list):
+    """
+    按顺序执行写入组，某组失败后停止，后续字段不再写入
     
-    success, message = write_int_register(0x83, auto_init)
-    return {"success": success, "message": message}
-
-@app.get("/read_auto_init")
-async def read_auto_init():
-    """读取自动初始化设置 (地址0x83)"""
-    success, message, value = read_int_register(0x83)
-    return {"success": success, "message": message, "value": value}
-
-@app.post("/write_rotation_stop_enable")
-async def write_rotation_stop_enable(enable: int = Form(...)):
-    """写入旋转堵停使能 (地址0x9E)"""
-    if enable not in [0, 1]:
-        return {"success": False, "message": "旋转堵停使能值应为0或1"}
+    Returns:
+        tuple: (各字段结果, 实际总线写入次数)
+    """
+    global modbus_connected
     
-    success, message = write_int_register(0x9E, enable)
-    return {"success": success, "message": message}
-
-@app.get("/read_rotation_stop_enable")
-async def read_rotation_stop_enable():
-    """读取旋转堵停使能 (地址0x9E)"""
-    success, message, value = read_int_register(0x9E)
-    return {"success": success, "message": message, "value": value}
-
-@app.post("/write_rotation_stop_sensitivity")
-async def write_rotation_stop_sensitivity(sensitivity: int = Form(...)):
-    """写入旋转堵停灵敏度 (地址0x9F)"""
-    if sensitivity < 0 or sensitivity > 100:
-        return {"success": False, "message": "灵敏度范围应为0-100"}
+    results = {}
+    writes = 0
+    for index, group in enumerate(groups):
+        if not slave_instance or not modbus_connected:
+            error = "Modbus未连接，无法写入"
+        else:
+            address = group[0][0].address
+            registers = []
+            for field, value in group:
+                registers += ModbusHelper.float_to_registers(value) if field.kind == "float" else [value]
+            try:
+                writes += 1
+                result = slave_instance.write_holding_regs(address, registers)
+                error = None if result == StatusCodeEnum.OK else f"写入寄存器0x{address:02X}失败: {result.errmsg}"
+            except Exception as e:
+                modbus_connected = False  # 发生异常时标记为未连接
+                error = f"写入寄存器0x{address:02X}异常: {str(e)}"
+            # 按字段更新缓存，使保存参数等命令寄存器只失效不缓存
+            offset = 0
+            for field, value in group:
+                update_cache_after_write(field.address, registers[offset:offset + field.width], error is None)
+                offset += field.width
+        
+        for field, value in group:
+            results[field.name] = {"success": error is None, "value": value,
+                                   "message": error or f"{field.label}已写入(0x{field.address:02X})"}
+        if error is not None:
+            for skipped in groups[index + 1:]:
+                for field, value in skipped:
+                    results[field.name] = {"success": False, "value": value, "message": "前序写入失败，未执行"}
+            break
+    return results, writes
+
+@app.post("/write_config_batch")
+async def write_config_batch(request: Request):
+    """
+    批量写入配置参数
     
-    success, message = write_int_register(0x9F, sensitivity)
-    return {"success": success, "message": message}
-
-@app.get("/read_rotation_stop_sensitivity")
-async def read_rotation_stop_sensitivity():
-    """读取旋转堵停灵敏度 (地址0x9F)"""
-    success, message, value = read_int_register(0x9F)
-    return {"success": success, "message": message, "value": value}
-
-@app.post("/write_reset_rotation")
-async def write_reset_rotation(reset: int = Form(...)):
-    """写入复位多圈转动值 (地址0x8F)"""
-    if reset not in [0, 1]:
-        return {"success": False, "message": "复位值应为0或1"}
+    请求体为JSON对象{字段名: 值}，可用字段见CONFIG_BATCH_FIELDS(如motor_enable、init_direction、
+    auto_init、rotation_stop_enable、rotation_stop_sensitivity、clamping_current_set、save_params)；
+    夹爪ID和波特率会改变通信链路，不能批量写入。
+    全部字段校验通过后才会写入，相邻寄存器合并为一次写入，save_params最后执行。
+    """
+    try:
+        changes = await request.json()
+    except ValueError:
+        return {"success": False, "message": "请求体应为JSON对象"}
+    if not isinstance(changes, dict) or not changes:
+        return {"success": False, "message": "请求体应为非空的JSON对象{字段名: 值}"}
     
-    success, message = write_int_register(0x8F, reset)
-    return {"success": success, "message": message}
-
-@app.post("/write_save_params")
-async def write_save_params(save: int = Form(...)):
-    """写入保存参数设置 (地址0x84)"""
-    if save not in [0, 1]:
-        return {"success": False, "message": "保存参数值应为0或1"}
+    errors = {}
+    for name, value in changes.items():
+        field = CONFIG_BATCH_FIELDS.get(name)
+        if name in LINK_FIELDS:
+            errors[name] = f"{REGISTERS[name].label}会改变通信链路，请通过/{REGISTERS[name].write_route}单独写入"
+            continue
+        if field is None:
+            errors[name] = f"不支持批量写入的字段: {name}"
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            errors[name] = f"{field.label}的值应为数字"
+            continue
+        try:
+            finite = math.isfinite(value)
+        except OverflowError:
+            finite = False
+        if not finite:
+            # json.loads接受NaN和Infinity，但它们无法转换为寄存器值，也无法按JSON原样返回
+            errors[name] = f"{field.label}的值应为有限数字"
+            changes[name] = str(value)
+            continue
+        if field.kind == "int":
+            if value != int(value):
+                errors[name] = f"{field.label}的值应为整数"
+                continue
+            changes[name] = value = int(value)
+        else:
+            changes[name] = value = float(value)
+        error = field.validate(value)
+        if error:
+            errors[name] = error
+    if errors:
+        return {
+            "success": False,
+            "message": "参数校验失败，未写入任何参数",
+            "results": {name: {"success": False, "value": changes[name], "message": errors.get(name, "未执行")}
+                        for name in changes}
+        }
     
-    success, message = write_int_register(0x84, save)
-    return {"success": success, "message": message}
+    groups = plan_config_writes(changes)
+    results, writes = await run_on_bus(write_config_groups, groups, priority=PRIORITY_WRITE)
+    success = all(result["success"] for result in results.values())
+    message = f"{len(changes)}个参数通过{writes}次写入" + ("完成" if success else "中断")
+    if success:
+        logger.info(f"批量写入配置: {', '.join(f'{name}={value}' for name, value in changes.items())}")
+    else:
+        logger.warning(message)
+    return {"success": success, "message": message, "writes": writes, "results": results}
+
+# 参数配置文件目录，与config.json同级；ID和波特率属于单台夹爪，不进入配置文件
+PROFILE_DIR = os.getenv("HLUI_PROFILE_DIR", "profiles")
+PROFILE_FIELDS = tuple(field for field in CONFIG_BATCH_FIELDS.values()
+                       if field.address >= 0x80 and field.name != "save_params")
+PROFILE_BLOCK_START = min(field.address for field in PROFILE_FIELDS)
+PROFILE_BLOCK_COUNT = max(field.address + field.width for field in PROFILE_FIELDS) - PROFILE_BLOCK_START
+PROFILE_LAYOUT = register_layout(PROFILE_BLOCK_START, PROFILE_BLOCK_COUNT,
+                                 tuple((field.name, field.address, field.kind) for field in PROFILE_FIELDS))
+
+def profile_path(name: str) -> str:
+    """
+    获取配置文件路径
     
-@app.get("/read_save_params")
-async def read_save_params():
-    """读取保存参数设置 (地址0x84)"""
-    success, message, value = read_int_register(0x84)
-    status_text = "未保存" if value == 0 else "已保存" if value == 1 else "未知"
-    return {"success": success, "message": message, "value": value, "status_text": status_text}
-
-
-
-
-
+    Raises:
+        ValueError: 名称为空或包含字母、数字、下划线和短横线以外的字符
+    """
+    if not name or len(name) > 64 or not name.replace("-", "").replace("_", "").isalnum():
+        raise ValueError("配置名称只能包含字母、数字、下划线和短横线，长度不超过64")
+    return os.path.join(PROFILE_DIR, f"{name}.json")
+
+def load_profile(name: str) -> dict:
+    """
+    读取并校验配置文件
     
-@app.get("/read_gripper_init_status")
-async def read_gripper_init_status():
-    """读取夹爪初始化状态 (地址0x40)"""
-    success, message, value = read_int_register(0x40)
-    status_text = {
-        0: "未初始化",
-        5: "初始化完成",
-        None: "读取失败"
-    }.get(value, f"初始化中({value})") if value is not None else "读取失败"
+    Raises:
+        ValueError: 名称非法、文件不存在、格式错误或参数不合法
+    """
+    path = profile_path(name)
+    if not os.path.exists(path):
+        raise ValueError(f"配置{name}不存在")
+    with open(path, "r", encoding="utf-8") as f:
+        profile = json.load(f)
     
-    return {"success": success, "message": message, "value": value, "status_text": status_text}
-
-# 加持部分接口
-@app.post("/write_clamping_position")
-async def write_clamping_position(position: float = Form(...)):
-    """写入加持位置 (地址2)"""
-    if position < 0 or position > 20:
-        return {"success": False, "message": "加持位置范围应为0-20mm"}
+    if not isinstance(profile, dict):
+        raise ValueError(f"配置{name}格式错误，应为JSON对象")
+    values = profile.get("fields")
+    if not isinstance(values, dict):
+        raise ValueError(f"配置{name}格式错误，fields应为{{字段名: 值}}对象")
+    for field in PROFILE_FIELDS:
+        if field.name not in values:
+            raise ValueError(f"配置{name}缺少字段{field.name}")
+        value = values[field.name]
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f"配置{name}: {field.label}的值应为有限数字")
+        if field.kind == "int" and value != int(value):
+            raise ValueError(f"配置{name}: {field.label}的值应为整数")
+        error = field.validate(value)
+        if error:
+            raise ValueError(f"配置{name}: {error}")
+    unknown = set(values) - {field.name for field in PROFILE_FIELDS}
+    if unknown:
+        raise ValueError(f"配置{name}包含不支持的字段: {', '.join(sorted(unknown))}")
+    return profile
+
+def read_profile_image():
+    """
+    一次块读取夹爪当前的配置参数(不使用缓存)
     
-    success, message = write_float_registers(2, position)
-    return {"success": success, "message": message}
+    Returns:
+        tuple: (是否成功, 提示信息, {字段名: 值})
+    """
+    register_cache.invalidate(PROFILE_BLOCK_START, PROFILE_BLOCK_COUNT)
+    success, message, registers = read_register_block(PROFILE_BLOCK_START, PROFILE_BLOCK_COUNT)
+    if not success:
+        return False, message, None
+    return True, message, PROFILE_LAYOUT.decode(registers)
 
-@app.post("/write_clamping_speed")
-async def write_clamping_speed(speed: float = Form(...)):
-    """写入加持速度 (地址4)"""
-    if speed < 1 or speed > 100:
-        return {"success": False, "message": "加持速度范围应为1-100mm/s"}
+def apply_profile_values(values: dict):
+    """
+    读取当前配置，只写入与目标不同的参数，有修改时最后保存参数(0x84)
     
-    success, message = write_float_registers(4, speed)
-    return {"success": success, "message": message}
-
-@app.get("/read_clamping_status")
-async def read_clamping_status():
-    """读取夹持状态 (地址0x41)"""
-    success, message, value = read_int_register(0x41)
-    status_text = {
-        0: "到位",
-        1: "运动中",
-        2: "加持中",
-        3: "掉落",
-        None: "读取失败"
-    }.get(value, f"未知状态({value})") if value is not None else "读取失败"
-    
-    return {"success": success, "message": message, "value": value, "status_text": status_text}
-
-@app.get("/read_clamping_position")
-async def read_clamping_position():
-    """读取加持位置反馈 (地址0x42)"""
-    success, message, value = read_float_registers(0x42)
-    return {"success": success, "message": message, "value": value}
-
-@app.get("/read_clamping_speed")
-async def read_clamping_speed():
-    """读取加持速度反馈 (地址0x44)"""
-    success, message, value = read_float_registers(0x44)
-    return {"success": success, "message": message, "value": value}
-
-@app.get("/read_clamping_current")
-async def read_clamping_current():
-    """读取加持电流反馈 (地址0x46)"""
-    success, message, value = read_float_registers(0x46)
-    return {"success": success, "message": message, "value": value}
-
-# 新增：加持电流写入接口
-@app.post("/write_clamping_current")
-async def write_clamping_current(current: float = Form(...)):
-    """写入加持电流 (地址0x06)"""
-    if current < 0.1 or current > 0.5:
-        return {"success": False, "message": "加持电流范围应为0.1-0.5A"}
-    
-    success, message = write_float_registers(0x06, current)
-    return {"success": success, "message": message}
-
-
-
-
-
-
-# 旋转部分接口
-@app.post("/write_rotation_angle")
-async def write_rotation_angle(angle: float = Form(...)):
-    """写入旋转绝对角度 (地址0x0A)"""
-    if angle < -3600000 or angle > 3600000:
-        return {"success": False, "message": "旋转角度范围应为-3600000-3600000度"}
+    Returns:
+        tuple: (是否成功, 提示信息, 差异{字段名: [当前值, 目标值]}, 各字段结果, 写入次数)
+    """
+    success, message, current = read_profile_image()
+    if not success:
+        return False, message, {}, {}, 0
     
-    success, message = write_float_registers(0x0A, angle)
-    return {"success": success, "message": message}
-
-@app.post("/write_rotation_speed")
-async def write_rotation_speed(speed: float = Form(...)):
-    """写入旋转速度 (地址0x0E)"""
-    if speed < 1 or speed > 1080:
-        return {"success": False, "message": "旋转速度范围应为1-1080度/秒"}
+    diff = {name: [current[name], value] for name, value in values.items() if current[name] != value}
+    if not diff:
+        return True, "参数与配置一致，无需写入", diff, {}, 0
     
-    success, message = write_float_registers(0x0E, speed)
-    return {"success": success, "message": message}
+    changes = {name: target for name, (_, target) in diff.items()}
+    changes["save_params"] = 1
+    results, writes = write_config_groups(plan_config_writes(changes))
+    success = all(result["success"] for result in results.values())
+    return success, f"{len(diff)}个参数不同，{writes}次写入" + ("完成并已保存" if success else "中断"), diff, results, writes
+
+@app.get("/profiles")
+async def list_profiles():
+    """列出已保存的参数配置"""
+    if not os.path.isdir(PROFILE_DIR):
+        return {"success": True, "profiles": []}
+    names = sorted(entry[:-5] for entry in os.listdir(PROFILE_DIR) if entry.endswith(".json"))
+    return {"success": True, "profiles": names}
+
+@app.get("/profiles/{name}")
+async def get_profile(name: str):
+    """获取参数配置内容"""
+    try:
+        return {"success": True, "profile": load_profile(name)}
+    except (ValueError, OSError) as e:
+        return {"success": False, "message": str(e)}
 
-@app.post("/write_rotation_current")
-async def write_rotation_current(current: float = Form(...)):
-    """写入旋转电流 (地址0x14)"""
-    if current < 0.2 or current > 1.0:
-        return {"success": False, "message": "旋转电流范围应为0.2-1.0A"}
+@app.post("/capture_profile")
+async def capture_profile(name: str = Form(...), overwrite: int = Form(0)):
+    """读取当前夹爪的配置参数并保存为配置文件"""
+    try:
+        path = profile_path(name)
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    if os.path.exists(path) and not overwrite:
+        return {"success": False, "message": f"配置{name}已存在，如需覆盖请设置overwrite=1"}
     
-    success, message = write_float_registers(0x14, current)
-    return {"success": success, "message": message}
-
-@app.get("/read_rotation_status")
-async def read_rotation_status():
-    """读取旋转状态反馈 (地址0x48)"""
-    success, message, value = read_int_register(0x48)
-    status_text = {
-        0: "到位",
-        1: "旋转中",
-        2: "旋转受阻",
-        3: "掉落",
-        4: "堵转停转",
-        None: "读取失败"
-    }.get(value, f"未知状态({value})") if value is not None else "读取失败"
+    success, message, values = await run_on_bus(read_profile_image, priority=PRIORITY_WRITE)
+    if not success:
+        return {"success": False, "message": message}
     
-    return {"success": success, "message": message, "value": value, "status_text": status_text}
-
-@app.get("/read_rotation_angle")
-async def read_rotation_angle():
-    """读取旋转角度反馈 (地址0x4A)"""
-    success, message, value = read_float_registers(0x4A)
-    return {"success": success, "message": message, "value": value}
-
-@app.get("/read_rotation_speed")
-async def read_rotation_speed():
-    """读取旋转速度反馈 (地址0x4C)"""
-    success, message, value = read_float_registers(0x4C)
-    return {"success": success, "message": message, "value": value}
-
-
-
-
-
+    profile = {"name": name, "captured_at": datetime.now().isoformat(), "fields": values}
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, ensure_ascii=False, indent=2)
+    logger.info(f"已保存参数配置{name}: {values}")
+    return {"success": True, "message": f"已保存参数配置{name}", "profile": profile}
+
+@app.post("/apply_profile")
+async def apply_profile(name: str = Form(...)):
+    """
+    把参数配置应用到当前夹爪
+    
+    先一次读取当前配置，只写入不同的参数(相邻寄存器合并)，有修改时最后写一次保存参数；
+    参数已一致时只有一次读取，没有写入。
+    """
+    try:
+        profile = load_profile(name)
+    except (ValueError, OSError) as e:
+        return {"success": False, "message": str(e)}
     
-@app.get("/read_rotation_current")
-async def read_rotation_current():
-    """读取旋转电流反馈 (地址0x4E)"""
-    success, message, value = read_float_registers(0x4E)
-    return {"success": success, "message": message, "value": value}
+    success, message, diff, results, writes = await run_on_bus(
+        apply_profile_values, profile["fields"], priority=PRIORITY_WRITE
+    )
+    if writes:
+        log = logger.info if success else logger.warning
+        log(f"应用参数配置{name}: {message}")
+    return {"success": success, "message": message, "diff": diff, "writes": writes, "results": results}
+
+@app.post("/delete_profile")
+async def delete_profile(name: str = Form(...)):
+    """删除参数配置"""
+    try:
+        path = profile_path(name)
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    if not os.path.exists(path):
+        return {"success": False, "message": f"配置{name}不存在"}
+    os.remove(path)
+    logger.info(f"已删除参数配置{name}")
+    return {"success": True, "message": f"已删除参数配置{name}"}
+
+# 批量读取的状态字段表: (名称, 地址, 类型)
+STATUS_FIELDS = [(field.name, field.address, field.kind) for field in REGISTER_MAP if "r" in field.access]
+
+# 启动时预先计算块读取计划: 0x06-0x07, 0x16, 0x40-0x4F, 0x80-0x84, 0x9E-0x9F
+STATUS_READ_PLAN = plan_block_reads(STATUS_FIELDS)
+
+def get_status_text(name: str, value):
+    """获取状态字段的显示文本"""
+    field = REGISTERS.get(name)
+    return field.text(value) if field else None
+
+async def read_fields_async(fields, plan=None, priority: int = PRIORITY_READ):
+    """
+    按块读取计划读取字段表，每个块作为独立的总线任务提交，
+    运动命令可以插入到块读取之间执行
+    
+    Returns:
+        {名称: (success, message, value)}
+    """
+    plan = plan or plan_block_reads(fields)
+    blocks = await asyncio.gather(*(
+        run_on_bus(read_register_block, start, count, priority=priority)
+        for start, count, members in plan
+    ))
+    results = {}
+    for (start, count, members), (success, message, registers) in zip(plan, blocks):
+        # 每个块一次解出全部字段
+        values = register_layout(start, count, tuple(members)).decode(registers) if success else {}
+        for name, address, kind in members:
+            results[name] = (success, message, values.get(name))
+    return results
+
+async def collect_status_data(priority: int = PRIORITY_READ):
+    """按块读取所有状态寄存器，同一块内的字段来自同一次总线事务"""
+    status_data = {}
+    results = await read_fields_async(STATUS_FIELDS, STATUS_READ_PLAN, priority)
+    
+    for name, address, kind in STATUS_FIELDS:
+        success, message, value = results[name]
+        status_data[name] = {
+            "success": success,
+            "value": value,
+            "message": message,
+            "status_text": get_status_text(name, value)
+        }
+    return status_data
 
 # 批量读取所有状态
 @app.get("/read_all_status")
@@ -750,77 +1615,7 @@ async def read_all_status():
             "data": {}
         }
     
-    status_data = {}
-    
-    # 读取所有状态寄存器
-    readers = [
-        ("gripper_id", read_int_register, 0x80),
-        ("baud_rate", read_int_register, 0x81),
-        ("gripper_init_status", read_int_register, 0x40),
-        ("motor_enable", read_int_register, 0x16),
-        ("init_direction", read_int_register, 0x82),
-        ("auto_init", read_int_register, 0x83),
-        ("rotation_stop_enable", read_int_register, 0x9E),
-        ("rotation_stop_sensitivity", read_int_register, 0x9F),
-        ("clamping_status", read_int_register, 0x41),
-        ("clamping_position", read_float_registers, 0x42),
-        ("clamping_speed", read_float_registers, 0x44),
-        ("clamping_current", read_float_registers, 0x46),
-        ("rotation_status", read_int_register, 0x48),
-        ("rotation_angle", read_float_registers, 0x4A),
-        ("rotation_speed", read_float_registers, 0x4C),
-        ("rotation_current", read_float_registers, 0x4E),
-        ("clamping_current_set", read_float_registers, 0x06),
-        ("save_params", read_int_register, 0x84), 
-    ]
-    
-    for name, reader_func, address in readers:
-        success, message, value = reader_func(address)
-        
-        # 为特定状态添加状态文本
-        status_text = None
-        if name == "gripper_init_status":
-            status_text = {
-                0: "未初始化",
-                5: "初始化完成",
-                None: "读取失败"
-            }.get(value, f"初始化中({value})") if value is not None else "读取失败"
-        elif name == "clamping_status":
-            status_text = {
-                0: "到位",
-                1: "运动中", 
-                2: "加持中",
-                3: "掉落",
-                None: "读取失败"
-            }.get(value, f"未知状态({value})") if value is not None else "读取失败"
-        elif name == "rotation_status":
-            status_text = {
-                0: "到位",
-                1: "旋转中",
-                2: "旋转受阻", 
-                3: "掉落",
-                4: "堵转停转",
-                None: "读取失败"
-            }.get(value, f"未知状态({value})") if value is not None else "读取失败"
-        elif name == "motor_enable":
-            status_text = "使能" if value == 1 else "关闭" if value == 0 else "未知"
-        elif name == "init_direction":
-            status_text = "张开校准" if value == 0 else "闭合校准" if value == 1 else "未知"
-        elif name == "auto_init":
-            status_text = "上电自动校准" if value == 0 else "手动校准" if value == 1 else "未知"
-        elif name == "rotation_stop_enable":
-            status_text = "不使能" if value == 0 else "使能" if value == 1 else "未知"
-        elif name == "baud_rate":
-            status_text = BAUD_RATE_MAP.get(value, "未知") if value is not None else "未知"
-        
-        status_data[name] = {
-            "success": success,
-            "value": value,
-            "message": message,
-            "status_text": status_text
-        }
-    
-    return {"success": True, "data": status_data}
+    return {"success": True, "data": await collect_status_data()}
 
 
 
@@ -835,18 +1630,399 @@ async def check_modbus_connected():
         "last_check_success": last_modbus_check_success
     }
 
+# 遥测推送: 后台唯一轮询任务读取总线，通过SSE向所有面板推送变化量
+TELEMETRY_POLL_INTERVAL = 0.5  # 轮询间隔(秒)
+TELEMETRY_KEEPALIVE = 15  # 无数据时的保活间隔(秒)
+TELEMETRY_QUEUE_SIZE = 20  # 每个订阅者的消息队列长度
+telemetry_subscribers = set()
+telemetry_snapshot = {}
+
+def read_indicator_digital_output():
+    """读取Modbus状态指示数字输出的当前值，失败时返回None"""
+    if controller_session.arm is None:
+        return None
+    output_number = indicator_outputs[0]
+    success, message, value = get_digital_output(output_number)
+    if not success:
+        logger.warning(f"读取数字输出{output_number}失败: {message}")
+    return value
+
+async def collect_telemetry_snapshot():
+    """采集一次完整的遥测快照"""
+    snapshot = {
+        "connection": {
+            "status": connection_status,
+            "modbus_status": modbus_status,
+            "modbus_connected": modbus_connected,
+            "last_modbus_check": last_modbus_check,
+            "attempts": reconnect_supervisor.failures,
+            "max_attempts": reconnect_supervisor.failure_threshold,
+            "reconnect": reconnect_supervisor.status()
+        },
+        "digital_output": {
+            "output_number": indicator_outputs[0],
+            "value": await run_on_bus(read_indicator_digital_output, priority=PRIORITY_POLL)
+        }
+    }
+    if modbus_connected:
+        # 推送数据不包含message字段，避免缓存提示文本变化产生无意义的增量
+        for name, field in (await collect_status_data(PRIORITY_POLL)).items():
+            snapshot[name] = {
+                "success": field["success"],
+                "value": field["value"],
+                "status_text": field["status_text"]
+            }
+    return snapshot
+
+def publish_telemetry(message: dict):
+    """向所有订阅者发布消息，队列已满的慢速订阅者改为接收完整快照"""
+    for queue in list(telemetry_subscribers):
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({"type": "snapshot", "data": dict(telemetry_snapshot)})
+
+async def telemetry_poller():
+    """后台遥测轮询任务，仅在有订阅者时访问总线"""
+    while True:
+        try:
+            if telemetry_subscribers:
+                snapshot = await collect_telemetry_snapshot()
+                delta = {k: v for k, v in snapshot.items() if telemetry_snapshot.get(k) != v}
+                telemetry_snapshot.update(snapshot)
+                if delta:
+                    publish_telemetry({"type": "delta", "data": delta, "timestamp": datetime.now().isoformat()})
+        except Exception as e:
+            logger.warning(f"遥测轮询异常: {e}")
+        await asyncio.sleep(TELEMETRY_POLL_INTERVAL)
+
+def format_sse(message: dict) -> str:
+    """格式化为Server-Sent Events消息"""
+    return f"data: {json.dumps(message, ensure_ascii=False)}\n\n"
+
+@app.get("/telemetry_stream")
+async def telemetry_stream(request: Request):
+    """遥测推送流(Server-Sent Events)，首条消息为完整快照，之后仅推送变化量"""
+    queue = asyncio.Queue(maxsize=TELEMETRY_QUEUE_SIZE)
+    if not telemetry_subscribers:
+        # 首个订阅者接入时，轮询任务可能已停止采样，立即采集一次
+        telemetry_snapshot.update(await collect_telemetry_snapshot())
+    telemetry_subscribers.add(queue)
+    
+    async def event_generator():
+        try:
+            yield format_sse({"type": "snapshot", "data": dict(telemetry_snapshot)})
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=TELEMETRY_KEEPALIVE)
+                    yield format_sse(message)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            telemetry_subscribers.discard(queue)
+    
+    return StreamingResponse(event_generator(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# 遥测录制：按固定频率采样0x41-0x4F，保存在定长环形缓冲区中
+RECORDER_START_ADDRESS = 0x41
+RECORDER_REGISTER_COUNT = 15  # 0x41-0x4F
+RECORDER_DEFAULT_RATE = 20.0  # 默认采样频率(Hz)
+RECORDER_MAX_RATE = 50.0  # 最高采样频率(Hz)
+RECORDER_DEFAULT_CAPACITY = 36000  # 默认容量(样本数)，20Hz下约30分钟
+RECORDER_MAX_CAPACITY = 1000000  # 最大容量(样本数)，约34MB
+# 录制列: (名称, array类型码, npy类型)
+RECORDER_COLUMNS = (
+    ("timestamp", "d", "<f8"),  # Unix时间(秒)
+    ("clamping_status", "H", "<u2"),
+    ("clamping_position", "f", "<f4"),
+    ("clamping_speed", "f", "<f4"),
+    ("clamping_current", "f", "<f4"),
+    ("rotation_status", "H", "<u2"),
+    ("rotation_angle", "f", "<f4"),
+    ("rotation_speed", "f", "<f4"),
+    ("rotation_current", "f", "<f4")
+)
+# 0x41-0x4F的寄存器布局，字段顺序与RECORDER_COLUMNS[1:]一致，0x49为保留寄存器
+RECORDER_LAYOUT = RegisterLayout(RECORDER_START_ADDRESS, RECORDER_REGISTER_COUNT, tuple(
+    (field.name, field.address, field.kind) for field in REGISTER_MAP
+    if RECORDER_START_ADDRESS <= field.address < RECORDER_START_ADDRESS + RECORDER_REGISTER_COUNT
+))
+# npy导出时单条记录的布局(小端、紧凑排列)
+RECORDER_RECORD = struct.Struct("<" + "".join(code for _, code, _ in RECORDER_COLUMNS))
+RECORDER_BINARY_MAGIC = b"HLTR"
+
+class TelemetryRecorder:
+    """
+    遥测录制器
+    
+    每列一个预分配的array，写满后从头覆盖，运行时间再长内存占用也不变。
+    采样时直接写入各列，不为单个样本创建dict。
+    """
+    
+    def __init__(self, capacity: int = RECORDER_DEFAULT_CAPACITY):
+        self.rate = RECORDER_DEFAULT_RATE
+        self.running = False
+        self.started_at = None
+        self.task = None  # 采样任务，同一时间只允许一个
+        self._lock = threading.Lock()
+        self.allocate(capacity)
+    
+    def allocate(self, capacity: int):
+        """按容量重新分配缓冲区，已录制的数据会被清空"""
+        with self._lock:
+            self.capacity = capacity
+            self._columns = [array.array(code, bytes(array.array(code).itemsize * capacity))
+                             for _, code, _ in RECORDER_COLUMNS]
+            self._reset()
+    
+    def clear(self):
+        """清空已录制的数据"""
+        with self._lock:
+            self._reset()
+    
+    def _reset(self):
+        self._head = 0  # 下一个样本写入的位置
+        self.count = 0  # 缓冲区中的样本数
+        self.total = 0  # 累计采样数
+        self.dropped = 0  # 读取失败或超时丢弃的采样数
+    
+    def append(self, timestamp: float, values):
+        """写入一个样本，values为按RECORDER_LAYOUT解出的字段值"""
+        with self._lock:
+            index = self._head
+            columns = self._columns
+            columns[0][index] = timestamp
+            for column, value in zip(columns[1:], values):
+                column[index] = value
+            self._head = (index + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+            self.total += 1
+    
+    def record_drop(self):
+        with self._lock:
+            self.dropped += 1
+    
+    def _ordered_columns(self):
+        # 按时间顺序返回各列数据的副本
+        with self._lock:
+            if self.count < self.capacity:
+                return [column[:self.count] for column in self._columns], self.count
+            return [column[self._head:] + column[:self._head] for column in self._columns], self.count
+    
+    def export_binary(self) -> bytes:
+        """
+        导出为紧凑二进制格式
+        
+        格式: b"HLTR" + 头部长度(uint32小端) + JSON头部 + 各列数据依次排列(小端)
+        """
+        columns, count = self._ordered_columns()
+        header = json.dumps({
+            "version": 1,
+            "count": count,
+            "rate": self.rate,
+            "start_address": RECORDER_START_ADDRESS,
+            "columns": [{"name": name, "dtype": dtype} for name, _, dtype in RECORDER_COLUMNS]
+        }).encode("utf-8")
+        parts = [RECORDER_BINARY_MAGIC, struct.pack("<I", len(header)), header]
+        for column in columns:
+            if sys.byteorder != "little":
+                column.byteswap()
+            parts.append(column.tobytes())
+        return b"".join(parts)
+    
+    def export_npy(self) -> bytes:
+        """导出为NumPy .npy格式的结构化数组(不依赖numpy)"""
+        columns, count = self._ordered_columns()
+        descr = [(name, dtype) for name, _, dtype in RECORDER_COLUMNS]
+        header = f"{{'descr': {descr!r}, 'fortran_order': False, 'shape': ({count},), }}"
+        # 魔数(6) + 版本(2) + 头部长度(2) + 头部需按64字节对齐，以换行结尾
+        padding = 64 - (10 + len(header) + 1) % 64
+        header = (header + " " * (padding % 64) + "\n").encode("latin1")
+        data = bytearray(RECORDER_RECORD.size * count)
+        offset = 0
+        for row in zip(*columns):
+            RECORDER_RECORD.pack_into(data, offset, *row)
+            offset += RECORDER_RECORD.size
+        return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header + bytes(data)
+    
+    def status(self):
+        """获取录制状态"""
+        with self._lock:
+            return {
+                "running": self.running,
+                "rate": self.rate,
+                "capacity": self.capacity,
+                "count": self.count,
+                "total": self.total,
+                "dropped": self.dropped,
+                "started_at": self.started_at,
+                "duration": round(self.count / self.rate, 1) if self.rate else None,
+                "buffer_bytes": sum(column.itemsize * len(column) for column in self._columns)
+            }
+
+telemetry_recorder = TelemetryRecorder()
+
+def sample_telemetry_block():
+    """直接从总线读取0x41-0x4F(不经过缓存)，失败返回None"""
+    if not slave_instance or not modbus_connected:
+        return None
+    registers, status = slave_instance.read_holding_regs(RECORDER_START_ADDRESS, RECORDER_REGISTER_COUNT)
+    if status != StatusCodeEnum.OK or len(registers) != RECORDER_REGISTER_COUNT:
+        return None
+    # 顺便刷新缓存，面板读取时可直接命中
+    register_cache.put(RECORDER_START_ADDRESS, registers)
+    return registers
+
+async def telemetry_recorder_loop():
+    """录制任务，按设定频率采样直到停止"""
+    next_sample = time.monotonic()
+    while telemetry_recorder.running:
+        period = 1.0 / telemetry_recorder.rate
+        try:
+            # 排队超过一个采样周期的任务已无意义，直接丢弃
+            registers = await run_on_bus(sample_telemetry_block, priority=PRIORITY_POLL, deadline=period)
+        except Exception as e:
+            logger.debug(f"遥测采样失败: {e}")
+            registers = None
+        if registers is None:
+            telemetry_recorder.record_drop()
+        else:
+            telemetry_recorder.append(time.time(), RECORDER_LAYOUT.unpack(registers))
+        
+        next_sample += period
+        delay = next_sample - time.monotonic()
+        if delay < 0:
+            # 落后于计划时不补采，从当前时间重新计时
+            next_sample = time.monotonic()
+            delay = 0
+        await asyncio.sleep(delay)
+
+async def stop_recorder_task():
+    """停止采样任务并等待其退出，保证重新开始录制前旧的采样循环已结束"""
+    telemetry_recorder.running = False
+    task, telemetry_recorder.task = telemetry_recorder.task, None
+    if task is not None and not task.done():
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+@app.post("/start_recorder")
+async def start_recorder(rate: float = Form(RECORDER_DEFAULT_RATE), capacity: Optional[int] = Form(None)):
+    """开始录制遥测数据，rate为采样频率(Hz)，capacity为缓冲区样本数(修改后清空已录制数据)"""
+    if rate <= 0 or rate > RECORDER_MAX_RATE:
+        return {"success": False, "message": f"采样频率应在0-{RECORDER_MAX_RATE:g}Hz之间"}
+    if capacity is not None and (capacity < 1 or capacity > RECORDER_MAX_CAPACITY):
+        return {"success": False, "message": f"缓冲区容量应在1-{RECORDER_MAX_CAPACITY}之间"}
+    
+    if capacity is not None and capacity != telemetry_recorder.capacity:
+        telemetry_recorder.allocate(capacity)
+    telemetry_recorder.rate = rate
+    if not telemetry_recorder.running:
+        # 停止后旧任务可能仍在等待下次采样，先等它退出再启动新任务
+        await stop_recorder_task()
+        telemetry_recorder.running = True
+        telemetry_recorder.started_at = datetime.now().isoformat()
+        telemetry_recorder.task = asyncio.create_task(telemetry_recorder_loop())
+        logger.info(f"开始录制遥测数据，采样频率{rate:g}Hz，容量{telemetry_recorder.capacity}")
+    return {"success": True, "message": "遥测录制已开始", **telemetry_recorder.status()}
+
+@app.post("/stop_recorder")
+async def stop_recorder():
+    """停止录制，已录制的数据保留"""
+    await stop_recorder_task()
+    logger.info("遥测录制已停止")
+    return {"success": True, "message": "遥测录制已停止", **telemetry_recorder.status()}
+
+@app.post("/clear_recorder")
+async def clear_recorder():
+    """清空已录制的数据"""
+    telemetry_recorder.clear()
+    return {"success": True, "message": "录制数据已清空", **telemetry_recorder.status()}
+
+@app.get("/recorder_status")
+async def recorder_status():
+    """获取录制状态"""
+    return {"success": True, **telemetry_recorder.status()}
+
+@app.get("/download_recording")
+async def download_recording(format: str = "npy"):
+    """下载录制数据，format为npy或bin"""
+    if format not in ("npy", "bin"):
+        return {"success": False, "message": "导出格式应为npy或bin"}
+    # 导出需要复制和打包整个缓冲区，放到线程中避免阻塞事件循环
+    if format == "npy":
+        content = await asyncio.to_thread(telemetry_recorder.export_npy)
+    else:
+        content = await asyncio.to_thread(telemetry_recorder.export_binary)
+    filename = f"telemetry_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
+    return Response(content, media_type="application/octet-stream",
+                    headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+@app.exception_handler(BusJobExpired)
+async def bus_job_expired_handler(request: Request, exc: BusJobExpired):
+    """总线任务排队超时时返回统一的失败结果"""
+    return JSONResponse({"success": False, "message": str(exc)})
+
+@app.get("/bus_stats")
+async def bus_stats():
+    """获取总线调度统计"""
+    return {"success": True, **bus_scheduler.stats()}
+
+@app.get("/bus_metrics")
+async def bus_metrics_endpoint():
+    """获取各寄存器读写的延迟和错误统计摘要"""
+    return {"success": True, "transactions": bus_metrics.snapshot()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus格式的总线指标"""
+    scheduler = bus_scheduler.stats()
+    reconnect = reconnect_supervisor.status()
+    cache = register_cache.stats()
+    lines = [
+        "# HELP hlui_bus_jobs_total 总线调度任务数",
+        "# TYPE hlui_bus_jobs_total counter",
+        f'hlui_bus_jobs_total{{result="executed"}} {scheduler["executed"]}',
+        f'hlui_bus_jobs_total{{result="expired"}} {scheduler["expired"]}',
+        f'hlui_bus_jobs_total{{result="coalesced"}} {scheduler["coalesced"]}',
+        "# HELP hlui_reconnect_attempts_total 重连尝试次数",
+        "# TYPE hlui_reconnect_attempts_total counter",
+        f"hlui_reconnect_attempts_total {reconnect['total_attempts']}",
+        "# HELP hlui_reconnect_circuit_open 重连熔断状态(1为熔断)",
+        "# TYPE hlui_reconnect_circuit_open gauge",
+        f"hlui_reconnect_circuit_open {1 if reconnect['state'] == ReconnectSupervisor.OPEN else 0}",
+        "# HELP hlui_register_cache_requests_total 寄存器缓存查询次数",
+        "# TYPE hlui_register_cache_requests_total counter",
+        f'hlui_register_cache_requests_total{{result="hit"}} {cache["hits"]}',
+        f'hlui_register_cache_requests_total{{result="miss"}} {cache["misses"]}'
+    ]
+    return bus_metrics.render() + "\n".join(lines) + "\n"
+
+@app.get("/cache_stats")
+async def cache_stats():
+    """获取寄存器缓存命中统计"""
+    return {"success": True, **register_cache.stats()}
+
 # 启动时自动开始连接检查任务
 @app.on_event("startup")
 async def startup_event():
     asyncio.create_task(check_connection_status())
+    asyncio.create_task(telemetry_poller())
 
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """应用关闭时断开所有连接"""
-    disconnect_arm()
-    disconnect_robot()
+    await stop_recorder_task()
+    await run_on_bus(disconnect_arm, priority=PRIORITY_WRITE)
+    await run_on_bus(disconnect_robot, priority=PRIORITY_WRITE)
+    bus_scheduler.shutdown()
     logger.info("应用已关闭，所有连接已断开")
 
 
@@ -11,6 +11,11 @@ let isReadingStatus = false; // 防止重复读取状态
 let lastModbusCheckTime = null;
 // 新增全局变量
 let currentModbusIndicatorDigitalOutput = 1; // 当前选择的Modbus指示器数字输出端口
+// 遥测推送
+let telemetrySource = null;
+let telemetryStreamActive = false;
+let telemetryState = {}; // 服务端推送的最新状态
+const TELEMETRY_STATUS_KEYS = ["connection", "digital_output"];
 
 
 
@@ -68,6 +73,12 @@ function toggleAutoRefresh() {
         autoRefreshInterval = null;
     }
     
+    // 实时推送已开启时，状态由服务端推送，无需定时刷新
+    if (telemetryStreamActive) {
+        showNotification('实时推送已开启，状态自动更新', 'info');
+        return;
+    }
+    
     // 如果Modbus未连接，不启动自动刷新
     if (!modbusConnected && interval > 0) {
         showNotification('Modbus未连接，自动刷新已暂停', 'warning');
@@ -91,22 +102,110 @@ function toggleAutoRefresh() {
 // 在window.onload函数中添加
 window.onload = function() {
     updateTime();
-    startConnectionStatusMonitor();
-    startModbusStatusMonitor();
-    startDigitalOutputMonitor();
+    // 优先订阅服务端推送，浏览器不支持时退回定时轮询
+    if (!startTelemetryStream()) {
+        startPollingMonitors();
+    }
     
     // 每秒更新一次时间
     setInterval(updateTime, 1000);
     
     // 初始检查Modbus状态和设置
     setTimeout(() => {
-        checkConnectionStatus();
+        if (!telemetryStreamActive) {
+            checkConnectionStatus();
+        }
         getCurrentModbusIndicatorSetting(); // 获取当前Modbus指示器设置
     }, 1000);//1s后执行任务
     
     showNotification('机械臂控制面板已加载完成', 'success');
 };
 
+// 启动定时轮询监控(推送不可用时的后备方案)
+function startPollingMonitors() {
+    if (!connectionMonitorInterval) startConnectionStatusMonitor();
+    if (!modbusMonitorInterval) startModbusStatusMonitor();
+    if (!digitalOutputMonitorInterval) startDigitalOutputMonitor();
+}
+
+// 停止定时轮询监控
+function stopPollingMonitors() {
+    [autoRefreshInterval, connectionMonitorInterval, modbusMonitorInterval, digitalOutputMonitorInterval]
+        .forEach(interval => { if (interval) clearInterval(interval); });
+    autoRefreshInterval = null;
+    connectionMonitorInterval = null;
+    modbusMonitorInterval = null;
+    digitalOutputMonitorInterval = null;
+}
+
+// 订阅服务端遥测推送
+function startTelemetryStream() {
+    if (!window.EventSource) {
+        return false;
+    }
+    
+    telemetrySource = new EventSource("/telemetry_stream");
+    
+    telemetrySource.onopen = function() {
+        telemetryStreamActive = true;
+        stopPollingMonitors();
+    };
+    
+    telemetrySource.onmessage = function(event) {
+        try {
+            const message = JSON.parse(event.data);
+            if (message.type === "snapshot") {
+                telemetryState = message.data;
+            } else {
+                Object.assign(telemetryState, message.data);
+            }
+            applyTelemetry(message.data);
+        } catch (error) {
+            console.error("解析遥测推送失败:", error);
+        }
+    };
+    
+    telemetrySource.onerror = function() {
+        // EventSource会自动重连，只有连接被关闭时才退回轮询
+        if (telemetrySource.readyState === EventSource.CLOSED) {
+            telemetryStreamActive = false;
+            telemetrySource = null;
+            startPollingMonitors();
+        }
+    };
+    
+    return true;
+}
+
+// 将推送的状态应用到界面
+function applyTelemetry(data) {
+    if (data.connection) {
+        const connection = data.connection;
+        modbusConnected = connection.modbus_connected;
+        lastModbusCheckTime = connection.last_modbus_check;
+        updateConnectionStatusDisplay(connection, connection);
+        updateLastCheckTime();
+        updateUIForModbusStatus(modbusConnected);
+    }
+    
+    if (data.digital_output && data.digital_output.value !== null) {
+        currentModbusIndicatorDigitalOutput = data.digital_output.output_number;
+        currentDigitalOutputState = data.digital_output.value;
+        updateDigitalOutputDisplay();
+        document.getElementById("status_current_do").textContent = currentDigitalOutputState === 1 ? "ON" : "OFF";
+        document.getElementById("status_do_control").textContent = "自动控制";
+        document.getElementById("status_modbus").textContent = document.getElementById("modbusStatus").textContent;
+        document.getElementById("status_last_check").textContent = new Date().toLocaleTimeString();
+    }
+    
+    // 寄存器状态有变化时整体刷新一次显示
+    const hasStatus = Object.keys(data).some(key => !TELEMETRY_STATUS_KEYS.includes(key));
+    if (hasStatus) {
+        updateAllStatusDisplay(telemetryState, false);
+        updateLastUpdateTime();
+    }
+}
+
 // 连接状态监控
 function startConnectionStatusMonitor() {
     // 立即检查一次
@@ -288,7 +387,12 @@ function updateConnectionStatusDisplay(data, modbusData) {
         reconnectInfo.textContent = "";
     } else if (data.status.includes("失败") || data.status.includes("异常") || data.status.includes("丢失")) {
         statusBadge.classList.add("status-disconnected");
-        reconnectInfo.textContent = `重连尝试: ${data.attempts}/${data.max_attempts}`;
+        if (data.reconnect && data.reconnect.state === "open") {
+            const retryAt = data.reconnect.next_attempt_at ? new Date(data.reconnect.next_attempt_at).toLocaleTimeString() : "";
+            reconnectInfo.textContent = `重连已熔断，${retryAt}后重试`;
+        } else {
+            reconnectInfo.textContent = `重连尝试: ${data.attempts}/${data.max_attempts}`;
+        }
     } else {
         statusBadge.classList.add("status-connecting");
     }
@@ -425,7 +529,7 @@ function getSafeValue(obj, property) {
 }
 
 // 更新所有状态显示
-function updateAllStatusDisplay(statusData) {
+function updateAllStatusDisplay(statusData, refreshDigitalOutput = true) {
     if (!statusData) {
         console.error('状态数据为空');
         showNotification('状态数据为空', 'error');
@@ -489,8 +593,10 @@ function updateAllStatusDisplay(statusData) {
         updateStatusValue("status_rotation_stop_enable", getSafeValue(statusData.rotation_stop_enable, 'status_text'));
         updateStatusValue("status_rotation_stop_sensitivity", getSafeValue(statusData.rotation_stop_sensitivity, 'value'));
         
-        // 更新数字输出状态
-        updateDigitalOutputStatus();
+        // 更新数字输出状态(推送模式下由服务端推送)
+        if (refreshDigitalOutput) {
+            updateDigitalOutputStatus();
+        }
         
     } catch (error) {
         console.error('更新状态显示时出错:', error);
@@ -576,14 +682,51 @@ async function getDigitalOutput(outputNumber) {
     }
 }
 
+// 一次请求读取全部数字输出，返回{编号: 值}，失败时返回null
+async function getDigitalOutputs(outputs = "all") {
+    try {
+        const response = await fetch(`/get_digital_outputs?outputs=${encodeURIComponent(outputs)}`);
+        const data = await response.json();
+        
+        if (data.success) {
+            return data.values;
+        } else {
+            showNotification(`获取数字输出状态失败: ${data.message}`, 'error');
+            return null;
+        }
+    } catch (error) {
+        showNotification('获取数字输出状态失败: ' + error.message, 'error');
+        return null;
+    }
+}
+
+// 显示已读取过的数字输出状态，新读取的值合并到已有状态中
+let digitalOutputValues = {};
+function updateDigitalOutputGrid(values) {
+    const grid = document.getElementById("digitalOutputGrid");
+    if (!grid || !values) return;
+    
+    Object.assign(digitalOutputValues, values);
+    grid.innerHTML = "";
+    Object.keys(digitalOutputValues).sort((a, b) => a - b).forEach(outputNumber => {
+        const item = document.createElement("span");
+        item.className = "status-badge " + (digitalOutputValues[outputNumber] === 1 ? "status-do-on" : "status-do-off");
+        item.textContent = `DO${outputNumber}`;
+        grid.appendChild(item);
+    });
+}
+
 // 修改updateDigitalOutputStatus函数
-async function updateDigitalOutputStatus() {
+// 定时刷新只读取指示器输出，手动刷新(refreshAll为true)时读取全部16个输出
+async function updateDigitalOutputStatus(refreshAll = false) {
     try {
-        const value = await getDigitalOutput(currentModbusIndicatorDigitalOutput);
-        if (value !== null) {
+        const values = await getDigitalOutputs(refreshAll ? "all" : String(currentModbusIndicatorDigitalOutput));
+        const value = values ? values[currentModbusIndicatorDigitalOutput] : null;
+        if (value !== null && value !== undefined) {
             currentDigitalOutputState = value;
             updateDigitalOutputDisplay();
         }
+        updateDigitalOutputGrid(values);
         
         // 更新状态监控页面的显示
         const modbusStatus = document.getElementById("modbusStatus").textContent;
@@ -1534,7 +1677,7 @@ document.addEventListener('keydown', function(event) {
 
 // 页面可见性变化时刷新状态
 document.addEventListener('visibilitychange', function() {
-    if (!document.hidden) {
+    if (!document.hidden && !telemetryStreamActive) {
         // 页面变为可见时立即检查状态
         setTimeout(() => {
             checkConnectionStatus();
@@ -1571,6 +1714,9 @@ window.addEventListener('unhandledrejection', function(event) {
 
 // 页面卸载时清理资源
 window.addEventListener('beforeunload', function() {
+    if (telemetrySource) {
+        telemetrySource.close();
+    }
     if (autoRefreshInterval) {
         clearInterval(autoRefreshInterval);
     }
@@ -2,8 +2,40 @@ from Agilebot.IR.A.arm import Arm
 from Agilebot.IR.A.status_code import StatusCodeEnum
 from Agilebot.IR.A.sdk_classes import Register, SerialParams
 from Agilebot.IR.A.sdk_types import ModbusChannel, ModbusParity
-import struct
+import asyncio
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
 import time
+import types
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+
+# HL和HLUI共用的寄存器工具gripper_common，依次在脚本目录(打包时由build_apps.py放在HL.py旁边)、
+# 仓库中的common目录和sys.path中查找。easyService注入globals加载脚本时可能没有__file__，
+# 脚本目录再依次由代码对象的文件名和工作目录推断
+_BASE_DIRS = []
+for _file in (globals().get('__file__'), sys._getframe().f_code.co_filename, os.path.join(os.getcwd(), "HL.py")):
+    if _file and os.path.isfile(_file):
+        _dir = os.path.dirname(os.path.abspath(_file))
+        if _dir not in _BASE_DIRS:
+            _BASE_DIRS.append(_dir)
+_BASE_DIR = _BASE_DIRS[0] if _BASE_DIRS else os.getcwd()
+_COMMON_DIRS = [path for base in _BASE_DIRS for path in (base, os.path.normpath(os.path.join(base, "..", "..", "common")))]
+for _path in _COMMON_DIRS:
+    if os.path.isfile(os.path.join(_path, "gripper_common.py")):
+        if _path not in sys.path:
+            sys.path.insert(0, _path)
+        break
+try:
+    from gripper_common import REGISTERS, BusMetrics, ModbusHelper, register_layout
+except ModuleNotFoundError as e:
+    if e.name != "gripper_common":
+        raise
+    raise ImportError(f"找不到HL依赖的gripper_common.py(已查找{'、'.join(_COMMON_DIRS) or '脚本目录(未能确定)'}和sys.path)，"
+                      f"请用build_apps.py重新打包HL，或把common/gripper_common.py复制到HL.py所在目录") from e
 
 logger = globals().get('logger')
 if logger is None:
@@ -11,42 +43,363 @@ if logger is None:
     logger = logging.getLogger(__name__)
 logger.info("开始")
 
-arm = Arm()
-ret = arm.connect("10.27.1.254")
-if ret != StatusCodeEnum.OK:
-    logger.error("连接失败")
-
-# 全局存储夹爪连接状态
-gripper_connections = {}
-
-class ModbusHelper:
-    """Modbus通信辅助类"""
-    
-    @staticmethod
-    def float_to_registers(float_value):
-        """将浮点数转换为两个16位寄存器"""
-        packed = struct.pack('>f', float_value)
-        high_word = struct.unpack('>H', packed[:2])[0]
-        low_word = struct.unpack('>H', packed[2:])[0]
-        return [high_word, low_word]
-    
-    @staticmethod
-    def registers_to_float(registers):
-        """将两个16位寄存器转换为浮点数"""
-        if len(registers) != 2:
-            raise ValueError("需要2个寄存器值来转换为浮点数")
-        
-        high_word = registers[0]
-        low_word = registers[1]
-        packed = struct.pack('>HH', high_word, low_word)
-        float_value = struct.unpack('>f', packed)[0]
-        return float_value
+DEFAULT_CONTROLLER_IP = "10.27.1.254"
+HEALTH_CHECK_INTERVAL = 5.0  # 后台健康检查间隔(秒)
+RECONNECT_INTERVAL = 2.0  # 健康检查失败后的重连间隔(秒)
+
+def _load_controller_ip() -> str:
+    """从config.json读取控制器地址，读取失败时使用默认地址"""
+    for path in (os.path.join(_BASE_DIR, "config.json"), "config.json"):
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f).get("controllerIp", DEFAULT_CONTROLLER_IP)
+        except (OSError, ValueError):
+            continue
+    return DEFAULT_CONTROLLER_IP
+
+class ArmSession:
+    """
+    机械臂连接会话
+    
+    首次使用时才建立连接，之后复用同一个Arm实例；后台线程定期做健康检查，
+    连接断开时自动重连并通知订阅者(例如总线管理器重新绑定slave)。
+    """
+    
+    def __init__(self, ip: str):
+        self.ip = ip
+        self.healthy = False
+        self._arm = None
+        self._lock = threading.Lock()
+        self._monitor = None
+        self._reconnect_callbacks = []
+    
+    def get(self):
+        """
+        获取已连接的Arm实例，未连接时立即连接
+        
+        Raises:
+            ConnectionError: 连接失败
+        """
+        with self._lock:
+            if self._arm is None:
+                self._arm = self._connect()
+                self._start_monitor()
+            return self._arm
+    
+    def on_reconnect(self, callback):
+        """注册重连回调"""
+        self._reconnect_callbacks.append(callback)
+    
+    def _connect(self):
+        """建立新的机械臂连接"""
+        logger.info(f"连接机械臂: {self.ip}")
+        new_arm = Arm()
+        ret = new_arm.connect(self.ip)
+        if ret != StatusCodeEnum.OK:
+            self.healthy = False
+            error_msg = f"机械臂连接失败: {ret.errmsg}"
+            logger.error(error_msg)
+            raise ConnectionError(error_msg)
+        self.healthy = True
+        return new_arm
+    
+    def _is_alive(self, current_arm) -> bool:
+        """检查连接是否存活，SDK不提供检测接口时视为存活"""
+        is_connect = getattr(current_arm, "is_connect", None)
+        if is_connect is None:
+            return True
+        try:
+            return bool(is_connect())
+        except Exception:
+            return False
+    
+    def _start_monitor(self):
+        if self._monitor is None or not self._monitor.is_alive():
+            self._monitor = threading.Thread(target=self._monitor_loop, name="arm-health", daemon=True)
+            self._monitor.start()
+    
+    def _monitor_loop(self):
+        """后台健康检查，连接断开时重连"""
+        while True:
+            time.sleep(HEALTH_CHECK_INTERVAL if self.healthy else RECONNECT_INTERVAL)
+            with self._lock:
+                current_arm = self._arm
+            if current_arm is not None and self._is_alive(current_arm):
+                self.healthy = True
+                continue
+            
+            logger.warning("机械臂连接已断开，尝试重连")
+            try:
+                new_arm = self._connect()
+            except ConnectionError:
+                continue
+            with self._lock:
+                self._arm = new_arm
+            if current_arm is not None:
+                try:
+                    current_arm.disconnect()
+                except Exception:
+                    pass
+            for callback in self._reconnect_callbacks:
+                callback()
+
+# 速度寄存器紧跟目标寄存器时，是否用一次多寄存器写入同时下发目标和速度。
+# 块写入按地址升序先写目标，只有在实机确认夹爪收到完整帧后才开始运动时才能打开
+BLOCK_MOTION_WRITE = False
+
+class _SlaveHandle:
+    """
+    带通道锁的slave句柄
+    
+    同一通道上的所有夹爪共享一把锁，每次读写都在锁内完成，多个线程驱动同一条
+    485总线上的多个夹爪时不会出现帧交错。需要连续多次读写不被打断时使用transaction()。
+    """
+    
+    def __init__(self, manager, slave, channel, id: int, lock):
+        self._manager = manager
+        self._slave = slave
+        self.channel = channel
+        self.id = id
+        self._lock = lock
+        self._local = threading.local()  # 当前线程事务内使用的slave
+    
+    @contextlib.contextmanager
+    def transaction(self):
+        """获取通道锁，在with块内的多次读写不会被其他线程插入"""
+        # 加锁顺序固定为管理器锁 -> 通道锁: 重新绑定(可能重新配置通道)在获取通道锁之前完成，
+        # 事务内的读写使用这里绑定的slave，不再进入管理器锁
+        slave = self._resolve()
+        with self._lock:
+            outer = getattr(self._local, "slave", None)
+            self._local.slave = outer or slave
+            try:
+                yield self
+            finally:
+                self._local.slave = outer
+    
+    def _resolve(self):
+        # 事务内直接使用已绑定的slave；否则在通道锁外重新绑定机械臂重连后失效的句柄
+        return getattr(self._local, "slave", None) or self._slave or self._manager._rebind(self)
+    
+    def read_holding_regs(self, address: int, count: int):
+        slave = self._resolve()
+        with self._lock:
+            return self._manager.metrics.call("read", address, count, slave.read_holding_regs, address, count)
+    
+    def write_holding_regs(self, address: int, registers):
+        slave = self._resolve()
+        with self._lock:
+            return self._manager.metrics.call("write", address, len(registers), slave.write_holding_regs,
+                                              address, registers)
+
+class ModbusBusManager:
+    """
+    Modbus总线管理器
+    
+    每个通道只在参数变化时调用一次set_parameter，并为每个(通道, 夹爪ID)缓存slave句柄，
+    同一进程可以在一条或多条485总线上驱动多个夹爪。机械臂重连后，句柄在下次使用时
+    按原参数重新配置通道并绑定新的slave。
+    """
+    
+    def __init__(self, session: ArmSession, metrics: BusMetrics = None):
+        self._session = session
+        self.metrics = metrics or BusMetrics()
+        self._lock = threading.Lock()
+        self._channels = {}  # 通道 -> {'params': 参数元组, 'lock': 通道锁}
+        self._slaves = {}  # (通道, 夹爪ID) -> _SlaveHandle
+    
+    def configure(self, channel, baud_rate: int, data_bits: int, stop_bits: int, parity, timeout: int):
+        """
+        配置通道参数，参数与当前配置相同时不重复下发
+        
+        Raises:
+            ConnectionError: 设置参数失败
+        """
+        params = (baud_rate, data_bits, stop_bits, parity, timeout)
+        with self._lock:
+            state = self._channels.get(channel)
+            if state is not None and state['params'] == params and state['configured']:
+                return
+            if state is None:
+                state = self._channels[channel] = {'params': None, 'configured': False, 'lock': threading.RLock()}
+            self._apply(channel, state, params)
+    
+    def _apply(self, channel, state, params):
+        """下发通道参数，调用方需持有self._lock"""
+        baud_rate, data_bits, stop_bits, parity, timeout = params
+        # 持有通道锁，等待正在进行的事务完成后再修改通道参数
+        with state['lock']:
+            if state['configured'] and state['params'] != params:
+                logger.warning(f"通道{channel}参数变更，该通道上的所有夹爪将使用新参数")
+            serial_params = SerialParams(
+                channel=channel,
+                ip="",
+                port=502,
+                baud=baud_rate,
+                data_bit=data_bits,
+                stop_bit=stop_bits,
+                parity=parity,
+                timeout=timeout
+            )
+            modbus_id, ret_code = self._session.get().modbus.set_parameter(serial_params)
+            if ret_code != StatusCodeEnum.OK:
+                state['configured'] = False
+                raise ConnectionError(f"设置Modbus参数失败: {ret_code.errmsg}")
+            state['params'] = params
+            state['configured'] = True
+    
+    def get_slave(self, channel, id: int) -> _SlaveHandle:
+        """
+        获取夹爪的slave句柄，通道需先调用configure
+        
+        Raises:
+            ConnectionError: 获取slave实例失败
+        """
+        with self._lock:
+            handle = self._slaves.get((channel, id))
+            if handle is not None:
+                return handle
+            state = self._channels.get(channel)
+            if state is None or not state['configured']:
+                raise ConnectionError(f"通道{channel}未配置")
+            handle = _SlaveHandle(self, self._new_slave(channel, id), channel, id, state['lock'])
+            self._slaves[(channel, id)] = handle
+            return handle
+    
+    def _new_slave(self, channel, id: int):
+        slave = self._session.get().modbus.get_slave(channel, id, 1)
+        if not slave:
+            raise ConnectionError(f"获取夹爪{id}的slave实例失败")
+        return slave
+    
+    def _rebind(self, handle: _SlaveHandle):
+        """机械臂重连后按原参数重新配置通道并绑定slave"""
+        with self._lock:
+            if handle._slave is None:
+                state = self._channels[handle.channel]
+                if not state['configured']:
+                    self._apply(handle.channel, state, state['params'])
+                handle._slave = self._new_slave(handle.channel, handle.id)
+            return handle._slave
+    
+    def release(self, channel, id: int):
+        """释放夹爪的slave句柄"""
+        with self._lock:
+            self._slaves.pop((channel, id), None)
+    
+    def invalidate(self):
+        """机械臂重连后调用: 保留通道参数，使通道配置和所有slave句柄在下次使用时重新建立"""
+        with self._lock:
+            for state in self._channels.values():
+                state['configured'] = False
+            for handle in self._slaves.values():
+                handle._slave = None
+
+# 连接会话和夹爪连接状态保存在sys.modules中，同一解释器内重复加载本脚本时复用已建立的连接
+_shared_state = sys.modules.get("_hl_shared_state")
+if _shared_state is None:
+    _shared_state = types.ModuleType("_hl_shared_state")
+    _shared_state.arm_session = ArmSession(_load_controller_ip())
+    _shared_state.bus_manager = ModbusBusManager(_shared_state.arm_session)
+    _shared_state.arm_session.on_reconnect(_shared_state.bus_manager.invalidate)
+    # 全局存储夹爪连接状态
+    _shared_state.gripper_connections = {}
+    sys.modules["_hl_shared_state"] = _shared_state
+if not hasattr(_shared_state, "bus_executor"):
+    # 异步接口的总线工作线程，所有异步调用的总线操作按提交顺序在这一个线程中执行
+    _shared_state.bus_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hl-bus")
+
+arm_session = _shared_state.arm_session
+bus_manager = _shared_state.bus_manager
+gripper_connections = _shared_state.gripper_connections
+bus_executor = _shared_state.bus_executor
+
+def get_arm():
+    """获取共享的机械臂连接，首次调用时建立连接"""
+    return arm_session.get()
+
+def get_bus_metrics() -> list:
+    """
+    获取Modbus总线各寄存器读写的延迟和错误统计
+    
+    Returns:
+        list: 每项包含op、address、count、avg_ms、p50_ms、p99_ms、timeouts、errors、bytes
+    """
+    return bus_manager.metrics.snapshot()
+
+def render_bus_metrics() -> str:
+    """获取Prometheus文本格式的总线指标"""
+    return bus_manager.metrics.render()
+
+def _get_slave(id: int):
+    """获取已连接夹爪的slave实例，未连接时抛出ConnectionError"""
+    if id not in gripper_connections or not gripper_connections[id]['connected']:
+        error_msg = f"夹爪{id}未连接，请先调用connect"
+        logger.error(error_msg)
+        raise ConnectionError(error_msg)
+    return gripper_connections[id]['slave']
+
+def _validate_field(field_name: str, value: float):
+    """按寄存器映射检查写入值，失败时抛出ValueError"""
+    error = REGISTERS[field_name].validate(value)
+    if error:
+        error_msg = f"{error}，当前值: {value}"
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+
+def _validate_move(position: float, speed: float):
+    """验证夹持运动参数，失败时抛出ValueError"""
+    _validate_field("clamping_target", position)
+    _validate_field("clamping_speed_set", speed)
+
+def _validate_rotate(angle: float, speed: float):
+    """验证旋转运动参数，失败时抛出ValueError"""
+    _validate_field("rotation_target", angle)
+    _validate_field("rotation_speed_set", speed)
+
+def _write_motion(slave_instance, target_address: int, target: float, speed_address: int, speed: float,
+                  target_name: str = "位置") -> int:
+    """
+    下发运动速度和目标值
+    
+    默认按先速度后目标的顺序分两次写入，因为写入目标后夹爪立即开始运动。
+    打开BLOCK_MOTION_WRITE且速度寄存器紧跟在目标寄存器之后时(夹持: 0x02位置 + 0x04速度)，
+    用一次多寄存器写入下发目标和速度，块写入被拒绝时退回分步写入。
+    
+    Returns:
+        实际使用的总线事务次数
+    
+    Raises:
+        RuntimeError: 写入失败
+    """
+    target_registers = ModbusHelper.float_to_registers(target)
+    speed_registers = ModbusHelper.float_to_registers(speed)
+    
+    with slave_instance.transaction():
+        if BLOCK_MOTION_WRITE and speed_address == target_address + len(target_registers):
+            result = slave_instance.write_holding_regs(target_address, target_registers + speed_registers)
+            if result == StatusCodeEnum.OK:
+                return 1
+            logger.warning(f"块写入{target_name}和速度失败: {result}，改为分步写入")
+        
+        # 需要先写入速度，如果先写入目标，夹爪立马就动了
+        result = slave_instance.write_holding_regs(speed_address, speed_registers)
+        if result != StatusCodeEnum.OK:
+            raise RuntimeError(f"写入速度失败: {result}")
         
+        result = slave_instance.write_holding_regs(target_address, target_registers)
+        if result != StatusCodeEnum.OK:
+            raise RuntimeError(f"写入{target_name}失败: {result}")
+        return 2
+
 def connect(id: int, baud_rate: int = 115200, parity: str = "NONE", 
-               data_bits: int = 8, stop_bits: int = 1, timeout: int = 500) -> int:
+               data_bits: int = 8, stop_bits: int = 1, timeout: int = 500,
+               channel: str = "WRIST_485_0") -> int:
     """
     连接夹爪
     
+    同一通道上的多个夹爪共享通道配置，参数不变时不会重复设置通道。
+    
     Args:
         id: 夹爪ID (1-247)
         baud_rate: 波特率 (9600, 19200, 38400, 57600, 115200, 153600, 256000)
@@ -54,6 +407,7 @@ def connect(id: int, baud_rate: int = 115200, parity: str = "NONE",
         data_bits: 数据位 (7, 8)
         stop_bits: 停止位 (1, 2)
         timeout: 超时时间(毫秒) (100-800)
+        channel: Modbus通道 ("WRIST_485_0", "WRIST_485_1"等ModbusChannel成员名)
     
     Returns:
         0: 成功
@@ -64,7 +418,7 @@ def connect(id: int, baud_rate: int = 115200, parity: str = "NONE",
         Exception: 其他错误
     """
     try:
-        logger.info(f"connect - 连接夹爪 ID: {id}, 波特率: {baud_rate}, 奇偶校验: {parity}, 数据位: {data_bits}, 停止位: {stop_bits}, 超时: {timeout}ms")
+        logger.info(f"connect - 连接夹爪 ID: {id}, 通道: {channel}, 波特率: {baud_rate}, 奇偶校验: {parity}, 数据位: {data_bits}, 停止位: {stop_bits}, 超时: {timeout}ms")
         
         # 参数类型验证
         try:
@@ -147,35 +501,29 @@ def connect(id: int, baud_rate: int = 115200, parity: str = "NONE",
             logger.error(f"超时时间参数格式错误: {e}")
             raise ValueError(f"超时时间参数错误: {e}") from e
         
-        # 所有参数验证通过后，设置Modbus参数
-        params = SerialParams(
-            channel=ModbusChannel.WRIST_485_0, 
-            ip="", 
-            port=502, 
-            baud=baud_rate,
-            data_bit=data_bits,
-            stop_bit=stop_bits, 
-            parity=parity_map[parity],
-            timeout=timeout
-        )
-        
-        # 设置参数
-        modbus_id, ret_code = arm.modbus.set_parameter(params)
-        if ret_code != StatusCodeEnum.OK:
-            error_msg = f"设置Modbus参数失败: {ret_code.errmsg}"
-            logger.error(error_msg)
-            raise ConnectionError(error_msg)
+        # 验证通道
+        try:
+            if not isinstance(channel, str):
+                raise ValueError(f"通道必须为字符串类型，当前类型: {type(channel).__name__}")
+            
+            channel_enum = getattr(ModbusChannel, channel.upper(), None)
+            if channel_enum is None:
+                raise ValueError(f"不支持的通道: {channel}")
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.error(f"通道参数格式错误: {e}")
+            raise ValueError(f"通道参数错误: {e}") from e
         
-        # 获取slave实例
-        slave_instance = arm.modbus.get_slave(ModbusChannel.WRIST_485_0, id, 1)
-        if not slave_instance:
-            error_msg = f"获取夹爪{id}的slave实例失败"
-            logger.error(error_msg)
-            raise ConnectionError(error_msg)
+        # 所有参数验证通过后，配置通道并获取slave句柄
+        try:
+            bus_manager.configure(channel_enum, baud_rate, data_bits, stop_bits, parity_map[parity], timeout)
+            slave_instance = bus_manager.get_slave(channel_enum, id)
+        except ConnectionError as e:
+            logger.error(str(e))
+            raise
         
         # 测试连接 - 读取夹爪ID
         try:
-            registers, status = slave_instance.read_holding_regs(0x80, 1)
+            registers, status = slave_instance.read_holding_regs(REGISTERS["gripper_id"].address, 1)
             if status == StatusCodeEnum.OK and len(registers) >= 1:
                 read_id = registers[0]
                 if read_id == id:
@@ -183,6 +531,7 @@ def connect(id: int, baud_rate: int = 115200, parity: str = "NONE",
                     # 存储连接状态
                     gripper_connections[id] = {
                         'slave': slave_instance,
+                        'channel': channel_enum,
                         'baud_rate': baud_rate,
                         'connected': True
                     }
@@ -207,7 +556,8 @@ def connect(id: int, baud_rate: int = 115200, parity: str = "NONE",
         logger.error(f"connect发生未知错误: {e}")
         raise Exception(f"连接过程中发生未知错误: {e}") from e
 
-def move(id: int, position: float, speed: float) -> int:
+def move(id: int, position: float, speed: float, handle: bool = False,
+         tolerance: float = 0.5, timeout: float = 30.0):
     """
     控制夹爪移动
     
@@ -215,9 +565,13 @@ def move(id: int, position: float, speed: float) -> int:
         id: 夹爪ID
         position: 目标位置 (0-20mm)
         speed: 移动速度 (1-100mm/s)
+        handle: 为True时返回由共享状态监视器跟踪的MotionHandle
+        tolerance: 句柄判定到位的误差范围 (mm)
+        timeout: 句柄超时时间(秒)
     
     Returns:
-        0: 成功
+        0: 成功(handle为False时)
+        MotionHandle: 到位、掉落或超时时完成的句柄(handle为True时)
     
     Raises:
         ValueError: 参数验证失败
@@ -229,51 +583,28 @@ def move(id: int, position: float, speed: float) -> int:
         logger.info(f"move - 夹爪{id}移动到位置: {position}mm, 速度: {speed}mm/s")
         
         # 检查连接状态
-        if id not in gripper_connections or not gripper_connections[id]['connected']:
-            error_msg = f"夹爪{id}未连接，请先调用connect"
-            logger.error(error_msg)
-            raise ConnectionError(error_msg)
+        slave_instance = _get_slave(id)
         
         # 参数验证
-        if position < 0 or position > 20:
-            error_msg = f"位置范围应为0-20mm，当前值: {position}"
-            logger.error(error_msg)
-            raise ValueError(error_msg)
-        
-        if speed < 1 or speed > 100:
-            error_msg = f"速度范围应为1-100mm/s，当前值: {speed}"
+        _validate_move(position, speed)
+        if handle and tolerance <= 0:
+            error_msg = f"容差必须大于0，当前值: {tolerance}"
             logger.error(error_msg)
             raise ValueError(error_msg)
         
-        slave_instance = gripper_connections[id]['slave']
-
-        
-        # 写入速度 (地址4),需要先写入速度，如果先写入位置，夹爪立马就动了
-        speed_registers = ModbusHelper.float_to_registers(speed)
-        result = slave_instance.write_holding_regs(4, speed_registers)
-        if result != StatusCodeEnum.OK:
-            error_msg = f"写入速度失败: {result}"
-            logger.error(error_msg)
-            raise RuntimeError(error_msg)
+        # 写入位置 (地址2) 和速度 (地址4)
+        try:
+            _write_motion(slave_instance, REGISTERS["clamping_target"].address, position,
+                          REGISTERS["clamping_speed_set"].address, speed, "位置")
+        except RuntimeError as e:
+            logger.error(str(e))
+            raise
+        gripper_connections[id]['clamping_speed'] = speed
         
         logger.info(f"夹爪{id}移动命令发送成功")
-
-
-
-
-
-
-
-        
-        # 写入位置 (地址2)
-        position_registers = ModbusHelper.float_to_registers(position)
-        result = slave_instance.write_holding_regs(2, position_registers)
-        if result != StatusCodeEnum.OK:
-            error_msg = f"写入位置失败: {result}"
-            logger.error(error_msg)
-            raise RuntimeError(error_msg)
-        return 0        
-
+        if handle:
+            return status_monitor.watch(MotionHandle(id, _clamping_axis(id, position, tolerance), timeout))
+        return 0
         
     except (ValueError, ConnectionError, RuntimeError):
         raise
@@ -281,7 +612,8 @@ def move(id: int, position: float, speed: float) -> int:
         logger.error(f"move发生错误: {e}")
         raise Exception(f"移动操作失败: {e}") from e
 
-def rotate(id: int, angle: float, speed: float) -> int:
+def rotate(id: int, angle: float, speed: float, handle: bool = False,
+           tolerance: float = 1.0, timeout: float = 30.0):
     """
     控制夹爪旋转
     
@@ -289,9 +621,13 @@ def rotate(id: int, angle: float, speed: float) -> int:
         id: 夹爪ID
         angle: 绝对角度 (-3600000 到 3600000度)
         speed: 旋转速度 (1-1080度/秒)
+        handle: 为True时返回由共享状态监视器跟踪的MotionHandle
+        tolerance: 句柄判定到位的误差范围 (度)
+        timeout: 句柄超时时间(秒)
     
     Returns:
-        0: 成功
+        0: 成功(handle为False时)
+        MotionHandle: 到位、受阻、掉落、堵转或超时时完成的句柄(handle为True时)
     
     Raises:
         ValueError: 参数验证失败
@@ -303,64 +639,421 @@ def rotate(id: int, angle: float, speed: float) -> int:
         logger.info(f"rotate - 夹爪{id}旋转到角度: {angle}度, 速度: {speed}度/秒")
         
         # 检查连接状态
-        if id not in gripper_connections or not gripper_connections[id]['connected']:
-            error_msg = f"夹爪{id}未连接，请先调用connect"
-            logger.error(error_msg)
-            raise ConnectionError(error_msg)
+        slave_instance = _get_slave(id)
         
         # 参数验证
-        if angle < -3600000 or angle > 3600000:
-            error_msg = f"角度范围应为-3600000到3600000度，当前值: {angle}"
+        _validate_rotate(angle, speed)
+        if handle and tolerance <= 0:
+            error_msg = f"容差必须大于0，当前值: {tolerance}"
             logger.error(error_msg)
             raise ValueError(error_msg)
         
-        if speed < 1 or speed > 1080:
-            error_msg = f"速度范围应为1-1080度/秒，当前值: {speed}"
-            logger.error(error_msg)
-            raise ValueError(error_msg)
+        # 写入绝对角度 (地址0x0A) 和旋转速度 (地址0x0E)，地址不连续，按先速度后角度分步写入
+        try:
+            _write_motion(slave_instance, REGISTERS["rotation_target"].address, angle,
+                          REGISTERS["rotation_speed_set"].address, speed, "角度")
+        except RuntimeError as e:
+            logger.error(str(e))
+            raise
+        gripper_connections[id]['rotation_speed'] = speed
+        
+        logger.info(f"夹爪{id}旋转命令发送成功")
+        if handle:
+            return status_monitor.watch(MotionHandle(id, _rotation_axis(id, angle, tolerance), timeout))
+        return 0
         
-        slave_instance = gripper_connections[id]['slave']
+    except (ValueError, ConnectionError, RuntimeError):
+        raise
+    except Exception as e:
+        logger.error(f"rotate发生错误: {e}")
+        raise Exception(f"旋转操作失败: {e}") from e
+
+# 轮询间隔(秒): 接近目标时按最小间隔轮询，远离目标时逐步放宽到最大间隔
+MIN_CHECK_INTERVAL = 0.01
+MAX_CHECK_INTERVAL = 0.25
+
+class _MotionAxis:
+    """等待运动完成时跟踪的单个轴(夹持或旋转)"""
+    
+    def __init__(self, name: str, status_address: int, value_address: int, fault_codes,
+                 fault_message: str, unit: str, target: float, tolerance: float, speed=None):
+        self.name = name
+        self.status_address = status_address
+        self.value_address = value_address
+        self.fault_codes = fault_codes
+        self.fault_message = fault_message
+        self.unit = unit
+        self.target = target
+        self.tolerance = tolerance
+        self.speed = speed  # 下发的运动速度，用于估计到达时间
+        self.done = False
+        self.moving_seen = False  # 本次等待中是否观察到过运动状态
+        self.value = None
+        self.velocity = 0.0  # 根据相邻两次采样估计的实际速度
+        self._last_time = None
+    
+    def update(self, value: float, now: float):
+        """记录一次采样并更新速度估计"""
+        if self.value is not None and now > self._last_time:
+            self.velocity = abs(value - self.value) / (now - self._last_time)
+        self.value = value
+        self._last_time = now
+    
+    def next_interval(self, min_interval: float, max_interval: float) -> float:
+        """根据剩余距离和速度估计到达时间，取其一半作为下次轮询间隔"""
+        speed = self.velocity if self.velocity > 0 else (self.speed or 0)
+        if speed <= 0:
+            return max_interval
+        remaining = abs(self.target - self.value) - self.tolerance
+        return max(min_interval, min(max_interval, remaining / speed / 2))
 
+def _clamping_axis(id: int, target_position: float, tolerance: float) -> _MotionAxis:
+    """夹持轴: 0x41夹持状态, 0x42位置反馈"""
+    return _MotionAxis("位置", REGISTERS["clamping_status"].address, REGISTERS["clamping_position"].address,
+                       (3,), "夹爪{id}夹持异常，物体掉落", "mm", target_position, tolerance, gripper_connections[id].get('clamping_speed'))
 
+def _rotation_axis(id: int, target_angle: float, tolerance: float) -> _MotionAxis:
+    """旋转轴: 0x48旋转状态, 0x4A角度反馈"""
+    return _MotionAxis("角度", REGISTERS["rotation_status"].address, REGISTERS["rotation_angle"].address,
+                       (2, 3, 4), "夹爪{id}旋转异常，状态码: {status}", "度", target_angle, tolerance, gripper_connections[id].get('rotation_speed'))
+
+class _AxisWaiter:
+    """
+    等待一组轴到位的轮询状态，同步和异步等待共用
+    
+    每次轮询用一次块读取同时取得所有轴的状态和反馈值。轴的反馈值进入容差范围，
+    或在观察到运动后状态寄存器回到0(到位)时，该轴完成。轮询间隔根据到达时间估计
+    自适应调整，接近目标时加密，长距离运动时放宽。verbose为False时到位和进度日志降为DEBUG。
+    """
+    
+    def __init__(self, id: int, axes, timeout: float, min_interval: float, max_interval: float,
+                 timeout_message: str, verbose: bool = True):
+        self.id = id
+        self.axes = axes
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.timeout_message = timeout_message
+        self.block_start = min(axis.status_address for axis in axes)
+        self.block_count = max(axis.value_address + 2 for axis in axes) - self.block_start
+        self.layout = register_layout(self.block_start, self.block_count, tuple(
+            field for axis in axes
+            for field in ((axis.name + "状态", axis.status_address, "int"), (axis.name, axis.value_address, "float"))
+        ))
+        self.log = logger.info if verbose else logger.debug
+        self.start_time = time.time()
+        self.last_log_time = self.start_time
+    
+    def expired(self) -> bool:
+        return time.time() - self.start_time >= self.timeout
+    
+    def timeout_error(self) -> TimeoutError:
+        logger.error(self.timeout_message)
+        return TimeoutError(self.timeout_message)
+    
+    def poll(self, slave_instance):
+        """
+        读取一次运动状态块并更新各轴
         
-        # 写入旋转速度 (地址0x0E)，需要写写入速度，如果先写入角度，夹爪立马就转了
-        speed_registers = ModbusHelper.float_to_registers(speed)
-        result = slave_instance.write_holding_regs(0x0E, speed_registers)
-        if result != StatusCodeEnum.OK:
-            error_msg = f"写入旋转速度失败: {result}"
-            logger.error(error_msg)
-            raise RuntimeError(error_msg)
+        Returns:
+            None: 所有轴已到位
+            float: 距下次轮询的等待时间(秒)
         
-        logger.info(f"夹爪{id}旋转命令发送成功")
-
+        Raises:
+            RuntimeError: 运动异常(掉落、受阻、堵转)
+        """
+        id = self.id
+        axes = self.axes
+        try:
+            registers, status = slave_instance.read_holding_regs(self.block_start, self.block_count)
+            
+            if status != StatusCodeEnum.OK or len(registers) != self.block_count:
+                logger.warning(f"读取运动状态失败，重试...")
+                return self.max_interval
+            
+            now = time.time()
+            interval = self.max_interval
+            values = self.layout.decode(registers)
+            for axis in axes:
+                if axis.done:
+                    continue
+                
+                axis_status = values[axis.name + "状态"]
+                axis.update(values[axis.name], now)
+                
+                # 检查是否到达目标
+                if abs(axis.value - axis.target) <= axis.tolerance:
+                    axis.done = True
+                    self.log(f"夹爪{id}已到达目标{axis.name}: {axis.value:.2f}{axis.unit}, 目标: {axis.target}{axis.unit}")
+                elif axis_status == 0 and axis.moving_seen:
+                    axis.done = True
+                    self.log(f"夹爪{id}{axis.name}状态到位: {axis.value:.2f}{axis.unit}, 目标: {axis.target}{axis.unit}")
+                elif axis_status in axis.fault_codes:
+                    error_msg = axis.fault_message.format(id=id, status=axis_status)
+                    logger.error(error_msg)
+                    raise RuntimeError(error_msg)
+                else:
+                    if axis_status != 0:
+                        axis.moving_seen = True
+                    interval = min(interval, axis.next_interval(self.min_interval, self.max_interval))
+            
+            if all(axis.done for axis in axes):
+                return None
+            
+            # 显示进度，每0.5秒打印一次
+            if now - self.last_log_time >= 0.5:
+                self.last_log_time = now
+                for axis in axes:
+                    if not axis.done:
+                        self.log(f"当前{axis.name}: {axis.value:.2f}{axis.unit}, 目标: {axis.target}{axis.unit}, "
+                                 f"差值: {abs(axis.value - axis.target):.2f}{axis.unit}, "
+                                 f"已等待{now - self.start_time:.1f}秒")
+            return interval
+            
+        except (RuntimeError):
+            raise
+        except Exception as e:
+            logger.warning(f"读取运动状态时发生错误: {e}，重试...")
+            return self.max_interval
 
+def _wait_axes(id: int, slave_instance, axes, timeout: float, min_interval: float,
+               max_interval: float, timeout_message: str, verbose: bool = True):
+    """
+    阻塞等待一组轴到位
+    
+    Raises:
+        RuntimeError: 运动异常(掉落、受阻、堵转)
+        TimeoutError: 等待超时
+    """
+    waiter = _AxisWaiter(id, axes, timeout, min_interval, max_interval, timeout_message, verbose)
+    while not waiter.expired():
+        interval = waiter.poll(slave_instance)
+        if interval is None:
+            return
+        time.sleep(interval)
+    raise waiter.timeout_error()
 
+async def _wait_axes_async(id: int, slave_instance, axes, timeout: float, min_interval: float,
+                           max_interval: float, timeout_message: str, verbose: bool = True):
+    """等待一组轴到位，总线读取在总线工作线程中执行，轮询间隔期间让出事件循环"""
+    waiter = _AxisWaiter(id, axes, timeout, min_interval, max_interval, timeout_message, verbose)
+    while not waiter.expired():
+        interval = await _run_on_bus(waiter.poll, slave_instance)
+        if interval is None:
+            return
+        await asyncio.sleep(interval)
+    raise waiter.timeout_error()
 
+def _clamping_wait(id: int, target_position: float, tolerance: float, timeout: float):
+    """验证夹持等待参数，返回(slave句柄, 轴列表, 超时提示)"""
+    error = REGISTERS["clamping_target"].validate(target_position)
+    if error:
+        error_msg = f"目标{error}，当前值: {target_position}"
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+    
+    if tolerance <= 0:
+        error_msg = f"容差必须大于0，当前值: {tolerance}"
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+    
+    slave_instance = _get_slave(id)
+    return (slave_instance, [_clamping_axis(id, target_position, tolerance)],
+            f"夹爪{id}到达目标位置等待超时({timeout}秒)")
 
+def _rotation_wait(id: int, target_angle: float, tolerance: float, timeout: float):
+    """验证旋转等待参数，返回(slave句柄, 轴列表, 超时提示)"""
+    error = REGISTERS["rotation_target"].validate(target_angle)
+    if error:
+        error_msg = f"目标{error}，当前值: {target_angle}"
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+    
+    if tolerance <= 0:
+        error_msg = f"容差必须大于0，当前值: {tolerance}"
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+    
+    slave_instance = _get_slave(id)
+    return (slave_instance, [_rotation_axis(id, target_angle, tolerance)],
+            f"夹爪{id}到达目标角度等待超时({timeout}秒)")
 
-        
-        # 写入绝对角度 (地址0x0A)
-        angle_registers = ModbusHelper.float_to_registers(angle)
-        result = slave_instance.write_holding_regs(0x0A, angle_registers)
-        if result != StatusCodeEnum.OK:
-            error_msg = f"写入角度失败: {result}"
-            logger.error(error_msg)
-            raise RuntimeError(error_msg)
-        return 0
+def _all_wait(id: int, target_position: float, target_angle: float, position_tolerance: float,
+              angle_tolerance: float, timeout: float):
+    """验证同时等待夹持和旋转的参数，返回(slave句柄, 轴列表, 超时提示)"""
+    slave_instance, clamping_axes, _ = _clamping_wait(id, target_position, position_tolerance, timeout)
+    _, rotation_axes, _ = _rotation_wait(id, target_angle, angle_tolerance, timeout)
+    return (slave_instance, clamping_axes + rotation_axes,
+            f"夹爪{id}等待夹持和旋转到位超时({timeout}秒)")
 
+STATUS_MONITOR_INTERVAL = 0.05  # 状态监视器轮询周期(秒)
 
+class MotionHandle(Future):
+    """
+    运动完成句柄
+    
+    到位时结果为最终反馈值；物体掉落、旋转受阻或堵转时异常为RuntimeError，超时为TimeoutError，
+    夹爪断开为ConnectionError。可以用result()阻塞等待、add_done_callback()注册回调，
+    或在协程中用asyncio.wrap_future()等待。
+    """
+    
+    def __init__(self, id: int, axis: _MotionAxis, timeout: float):
+        super().__init__()
+        self.id = id
+        self.axis = axis
+        self.timeout = timeout
+        self.deadline = time.time() + timeout
+    
+    def _finish(self, result=None, exception: BaseException = None) -> bool:
+        # 可能已被调用方取消，忽略重复设置
+        try:
+            if exception is not None:
+                self.set_exception(exception)
+            else:
+                self.set_result(result)
+            return True
+        except InvalidStateError:
+            return False
 
+class StatusMonitor:
+    """
+    共享运动状态监视器
+    
+    后台线程每个周期为每个有待完成句柄的夹爪读取一次运动状态块(0x41-0x4B)，同一夹爪上
+    任意数量的句柄共用这一次读取，运动故障在下一个周期即通知所有相关句柄。没有待完成
+    句柄时线程挂起，不访问总线。
+    """
+    
+    def __init__(self, interval: float = STATUS_MONITOR_INTERVAL):
+        self.interval = interval
+        self.ticks = 0  # 轮询周期数
+        self.reads = 0  # 总线读取次数
+        self._handles = {}  # 夹爪ID -> [MotionHandle]
+        self._cond = threading.Condition()
+        self._thread = None
+        fields = (REGISTERS["clamping_status"], REGISTERS["clamping_position"],
+                  REGISTERS["rotation_status"], REGISTERS["rotation_angle"])
+        self._block_start = min(field.address for field in fields)
+        self._block_count = max(field.address + field.width for field in fields) - self._block_start
+    
+    def watch(self, handle: MotionHandle) -> MotionHandle:
+        """登记一个待完成句柄"""
+        with self._cond:
+            self._handles.setdefault(handle.id, []).append(handle)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="hl-status-monitor", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        return handle
+    
+    def pending(self) -> int:
+        """待完成句柄数"""
+        with self._cond:
+            return sum(len(handles) for handles in self._handles.values())
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._handles:
+                    self._cond.wait()
+                snapshot = {id: list(handles) for id, handles in self._handles.items()}
+            
+            self.ticks += 1
+            for id, handles in snapshot.items():
+                try:
+                    self._poll(id, handles)
+                except Exception as e:
+                    logger.warning(f"状态监视器轮询夹爪{id}异常: {e}")
+            
+            with self._cond:
+                for id in list(self._handles):
+                    remaining = [handle for handle in self._handles[id] if not handle.done()]
+                    if remaining:
+                        self._handles[id] = remaining
+                    else:
+                        del self._handles[id]
+                if self._handles:
+                    self._cond.wait(self.interval)
+    
+    def _poll(self, id: int, handles):
+        connection = gripper_connections.get(id)
+        if connection is None or not connection['connected']:
+            for handle in handles:
+                handle._finish(exception=ConnectionError(f"夹爪{id}未连接"))
+            return
         
-
+        # 同一轴上可能有多个句柄，字段去重后生成布局
+        layout = register_layout(self._block_start, self._block_count, tuple(dict.fromkeys(
+            field for handle in handles
+            for field in ((handle.axis.name + "状态", handle.axis.status_address, "int"),
+                          (handle.axis.name, handle.axis.value_address, "float"))
+        )))
+        values = None
+        try:
+            self.reads += 1
+            registers, status = connection['slave'].read_holding_regs(self._block_start, self._block_count)
+            if status == StatusCodeEnum.OK and len(registers) == self._block_count:
+                values = layout.decode(registers)
+            else:
+                logger.debug(f"状态监视器读取夹爪{id}运动状态失败: {status}")
+        except Exception as e:
+            # 读取失败本周期只检查超时
+            logger.debug(f"状态监视器读取夹爪{id}运动状态异常: {e}")
+        now = time.time()
         
-    except (ValueError, ConnectionError, RuntimeError):
-        raise
-    except Exception as e:
-        logger.error(f"rotate发生错误: {e}")
-        raise Exception(f"旋转操作失败: {e}") from e
+        for handle in handles:
+            if handle.done():
+                continue
+            axis = handle.axis
+            if values is not None:
+                axis_status = values[axis.name + "状态"]
+                axis.update(values[axis.name], now)
+                if abs(axis.value - axis.target) <= axis.tolerance or (axis_status == 0 and axis.moving_seen):
+                    logger.debug(f"夹爪{id}{axis.name}到位: {axis.value:.2f}{axis.unit}, 目标: {axis.target}{axis.unit}")
+                    handle._finish(result=axis.value)
+                    continue
+                if axis_status in axis.fault_codes:
+                    error_msg = axis.fault_message.format(id=id, status=axis_status)
+                    logger.error(error_msg)
+                    handle._finish(exception=RuntimeError(error_msg))
+                    continue
+                if axis_status != 0:
+                    axis.moving_seen = True
+            if now > handle.deadline:
+                error_msg = f"夹爪{id}等待{axis.name}到位超时({handle.timeout}秒)"
+                logger.error(error_msg)
+                handle._finish(exception=TimeoutError(error_msg))
+
+# 与连接会话一样保存在共享状态中，重复加载脚本时复用同一个监视线程
+status_monitor = getattr(_shared_state, "status_monitor", None)
+if status_monitor is None:
+    status_monitor = _shared_state.status_monitor = StatusMonitor()
+
+def watch_clamping(id: int, target_position: float, tolerance: float = 0.5, timeout: float = 30.0) -> MotionHandle:
+    """
+    由共享状态监视器跟踪夹持运动，返回到位/故障时完成的句柄
+    
+    Raises:
+        ValueError: 参数验证失败
+        ConnectionError: 夹爪未连接
+    """
+    _, axes, _ = _clamping_wait(id, target_position, tolerance, timeout)
+    return status_monitor.watch(MotionHandle(id, axes[0], timeout))
+
+def watch_rotation(id: int, target_angle: float, tolerance: float = 1.0, timeout: float = 30.0) -> MotionHandle:
+    """
+    由共享状态监视器跟踪旋转运动，返回到位/故障时完成的句柄
+    
+    Raises:
+        ValueError: 参数验证失败
+        ConnectionError: 夹爪未连接
+    """
+    _, axes, _ = _rotation_wait(id, target_angle, tolerance, timeout)
+    return status_monitor.watch(MotionHandle(id, axes[0], timeout))
 
 def wait_clamping_position(id: int, target_position: float, tolerance: float = 0.5, 
-                             timeout: float = 30.0, check_interval: float = 0.1) -> int:
+                             timeout: float = 30.0, check_interval: float = MAX_CHECK_INTERVAL,
+                             min_interval: float = MIN_CHECK_INTERVAL) -> int:
     """
     等待夹持到具体位置
     
@@ -369,7 +1062,8 @@ def wait_clamping_position(id: int, target_position: float, tolerance: float = 0
         target_position: 目标位置 (0-20mm)
         tolerance: 允许的误差范围 (mm)
         timeout: 超时时间(秒)
-        check_interval: 检查间隔(秒)
+        check_interval: 最大检查间隔(秒)，远离目标时的轮询间隔
+        min_interval: 最小检查间隔(秒)，接近目标时的轮询间隔
     
     Returns:
         0: 成功到达目标位置
@@ -384,71 +1078,9 @@ def wait_clamping_position(id: int, target_position: float, tolerance: float = 0
     try:
         logger.info(f"wait_clamping_position - 等待夹爪{id}到达位置: {target_position}mm, 容差: {tolerance}mm")
         
-        # 参数验证
-        if target_position < 0 or target_position > 20:
-            error_msg = f"目标位置范围应为0-20mm，当前值: {target_position}"
-            logger.error(error_msg)
-            raise ValueError(error_msg)
-        
-        if tolerance <= 0:
-            error_msg = f"容差必须大于0，当前值: {tolerance}"
-            logger.error(error_msg)
-            raise ValueError(error_msg)
-        
-        # 检查连接状态
-        if id not in gripper_connections or not gripper_connections[id]['connected']:
-            error_msg = f"夹爪{id}未连接"
-            logger.error(error_msg)
-            raise ConnectionError(error_msg)
-        
-        slave_instance = gripper_connections[id]['slave']
-        start_time = time.time()
-        
-        while time.time() - start_time < timeout:
-            try:
-                # 读取当前位置 (地址0x42)
-                registers, status = slave_instance.read_holding_regs(0x42, 2)
-                
-                if status != StatusCodeEnum.OK or len(registers) != 2:
-                    logger.warning(f"读取当前位置失败，重试...")
-                    time.sleep(check_interval)
-                    continue
-                
-                current_position = ModbusHelper.registers_to_float(registers)
-                
-                # 检查是否到达目标位置
-                position_diff = abs(current_position - target_position)
-                
-                if position_diff <= tolerance:
-                    logger.info(f"夹爪{id}已到达目标位置: {current_position:.2f}mm, 目标: {target_position}mm")
-                    return 0  # 成功到达目标位置
-                
-                # 读取夹持状态检查是否异常
-                status_registers, status_code = slave_instance.read_holding_regs(0x41, 1)
-                if status_code == StatusCodeEnum.OK and len(status_registers) >= 1:
-                    clamping_status = status_registers[0]
-                    if clamping_status == 3:  # 掉落
-                        error_msg = f"夹爪{id}夹持异常，物体掉落"
-                        logger.error(error_msg)
-                        raise RuntimeError(error_msg)
-                
-                # 显示进度
-                elapsed = time.time() - start_time
-                if int(elapsed * 10) % 5 == 0:  # 每0.5秒打印一次
-                    logger.info(f"当前位置: {current_position:.2f}mm, 目标: {target_position}mm, 差值: {position_diff:.2f}mm, 已等待{elapsed:.1f}秒")
-                
-                time.sleep(check_interval)
-                
-            except (RuntimeError):
-                raise
-            except Exception as e:
-                logger.warning(f"读取位置时发生错误: {e}，重试...")
-                time.sleep(check_interval)
-        
-        # 超时
-        error_msg = f"夹爪{id}到达目标位置等待超时({timeout}秒)"
-        logger.error(error_msg)
-        raise TimeoutError(error_msg)
+        slave_instance, axes, timeout_message = _clamping_wait(id, target_position, tolerance, timeout)
+        _wait_axes(id, slave_instance, axes, timeout, min_interval, check_interval, timeout_message)
+        return 0  # 成功到达目标位置
         
     except (ValueError, ConnectionError, TimeoutError, RuntimeError):
         raise
@@ -457,7 +1089,8 @@ def wait_clamping_position(id: int, target_position: float, tolerance: float = 0
         raise Exception(f"等待夹持位置失败: {e}") from e
 
 def wait_rotation_angle(id: int, target_angle: float, tolerance: float = 1.0,
-                           timeout: float = 30.0, check_interval: float = 0.1) -> int:
+                           timeout: float = 30.0, check_interval: float = MAX_CHECK_INTERVAL,
+                           min_interval: float = MIN_CHECK_INTERVAL) -> int:
     """
     等待旋转到具体角度
     
@@ -466,7 +1099,8 @@ def wait_rotation_angle(id: int, target_angle: float, tolerance: float = 1.0,
         target_angle: 目标角度 (度)
         tolerance: 允许的误差范围 (度)
         timeout: 超时时间(秒)
-        check_interval: 检查间隔(秒)
+        check_interval: 最大检查间隔(秒)，远离目标时的轮询间隔
+        min_interval: 最小检查间隔(秒)，接近目标时的轮询间隔
     
     Returns:
         0: 成功到达目标角度
@@ -481,78 +1115,257 @@ def wait_rotation_angle(id: int, target_angle: float, tolerance: float = 1.0,
     try:
         logger.info(f"wait_rotation_angle - 等待夹爪{id}到达角度: {target_angle}度, 容差: {tolerance}度")
         
-        # 参数验证
-        if target_angle < -3600000 or target_angle > 3600000:
-            error_msg = f"目标角度范围应为-3600000到3600000度，当前值: {target_angle}"
-            logger.error(error_msg)
-            raise ValueError(error_msg)
+        slave_instance, axes, timeout_message = _rotation_wait(id, target_angle, tolerance, timeout)
+        _wait_axes(id, slave_instance, axes, timeout, min_interval, check_interval, timeout_message)
+        return 0  # 成功到达目标角度
         
-        if tolerance <= 0:
-            error_msg = f"容差必须大于0，当前值: {tolerance}"
-            logger.error(error_msg)
-            raise ValueError(error_msg)
+    except (ValueError, ConnectionError, TimeoutError, RuntimeError):
+        raise
+    except Exception as e:
+        logger.error(f"wait_rotation_angle发生错误: {e}")
+        raise Exception(f"等待旋转角度失败: {e}") from e
+
+def move_and_rotate(id: int, position: float, clamping_speed: float,
+                    angle: float, rotation_speed: float) -> int:
+    """
+    同时启动夹持和旋转运动
+    
+    Args:
+        id: 夹爪ID
+        position: 目标位置 (0-20mm)
+        clamping_speed: 夹持速度 (1-100mm/s)
+        angle: 绝对角度 (-3600000 到 3600000度)
+        rotation_speed: 旋转速度 (1-1080度/秒)
+    
+    Returns:
+        0: 成功
+    
+    Raises:
+        ValueError: 参数验证失败
+        ConnectionError: 连接失败
+        RuntimeError: 操作失败
+        Exception: 其他错误
+    """
+    try:
+        logger.info(f"move_and_rotate - 夹爪{id}移动到位置: {position}mm, 速度: {clamping_speed}mm/s, "
+                    f"旋转到角度: {angle}度, 速度: {rotation_speed}度/秒")
         
-        # 检查连接状态
-        if id not in gripper_connections or not gripper_connections[id]['connected']:
-            error_msg = f"夹爪{id}未连接"
-            logger.error(error_msg)
-            raise ConnectionError(error_msg)
+        # 两个轴的参数全部验证通过后才下发，避免只启动其中一个轴
+        slave_instance = _get_slave(id)
+        _validate_move(position, clamping_speed)
+        _validate_rotate(angle, rotation_speed)
         
-        slave_instance = gripper_connections[id]['slave']
-        start_time = time.time()
+        try:
+            _write_motion(slave_instance, REGISTERS["clamping_target"].address, position,
+                          REGISTERS["clamping_speed_set"].address, clamping_speed, "位置")
+            _write_motion(slave_instance, REGISTERS["rotation_target"].address, angle,
+                          REGISTERS["rotation_speed_set"].address, rotation_speed, "角度")
+        except RuntimeError as e:
+            logger.error(str(e))
+            raise
+        gripper_connections[id]['clamping_speed'] = clamping_speed
+        gripper_connections[id]['rotation_speed'] = rotation_speed
         
-        while time.time() - start_time < timeout:
-            try:
-                # 读取当前角度 (地址0x4A)
-                registers, status = slave_instance.read_holding_regs(0x4A, 2)
-                
-                if status != StatusCodeEnum.OK or len(registers) != 2:
-                    logger.warning(f"读取当前角度失败，重试...")
-                    time.sleep(check_interval)
-                    continue
-                
-                current_angle = ModbusHelper.registers_to_float(registers)
-                
-                # 计算角度差
-                angle_diff = abs(current_angle - target_angle)
-                
-                # 检查是否到达目标角度
-                if angle_diff <= tolerance:
-                    logger.info(f"夹爪{id}已到达目标角度: {current_angle:.2f}度, 目标: {target_angle}度")
-                    return 0  # 成功到达目标角度
-                
-                # 读取旋转状态检查是否异常
-                status_registers, status_code = slave_instance.read_holding_regs(0x48, 1)
-                if status_code == StatusCodeEnum.OK and len(status_registers) >= 1:
-                    rotation_status = status_registers[0]
-                    if rotation_status in [2, 3, 4]:  # 旋转受阻、掉落、堵转
-                        error_msg = f"夹爪{id}旋转异常，状态码: {rotation_status}"
-                        logger.error(error_msg)
-                        raise RuntimeError(error_msg)
-                
-                # 显示进度
-                elapsed = time.time() - start_time
-                if int(elapsed * 10) % 5 == 0:  # 每0.5秒打印一次
-                    logger.info(f"当前角度: {current_angle:.2f}度, 目标: {target_angle}度, 差值: {angle_diff:.2f}度, 已等待{elapsed:.1f}秒")
-                
-                time.sleep(check_interval)
-                
-            except (RuntimeError):
-                raise
-            except Exception as e:
-                logger.warning(f"读取角度时发生错误: {e}，重试...")
-                time.sleep(check_interval)
-        
-        # 超时
-        error_msg = f"夹爪{id}到达目标角度等待超时({timeout}秒)"
-        logger.error(error_msg)
-        raise TimeoutError(error_msg)
+        logger.info(f"夹爪{id}移动和旋转命令发送成功")
+        return 0
+        
+    except (ValueError, ConnectionError, RuntimeError):
+        raise
+    except Exception as e:
+        logger.error(f"move_and_rotate发生错误: {e}")
+        raise Exception(f"移动和旋转操作失败: {e}") from e
+
+def wait_all(id: int, target_position: float, target_angle: float,
+             position_tolerance: float = 0.5, angle_tolerance: float = 1.0,
+             timeout: float = 30.0, check_interval: float = MAX_CHECK_INTERVAL,
+             min_interval: float = MIN_CHECK_INTERVAL) -> int:
+    """
+    同时等待夹持和旋转到位，每次轮询只读取一次0x41-0x4B运动状态块
+    
+    Args:
+        id: 夹爪ID
+        target_position: 目标位置 (0-20mm)
+        target_angle: 目标角度 (度)
+        position_tolerance: 位置允许的误差范围 (mm)
+        angle_tolerance: 角度允许的误差范围 (度)
+        timeout: 超时时间(秒)
+        check_interval: 最大检查间隔(秒)，远离目标时的轮询间隔
+        min_interval: 最小检查间隔(秒)，接近目标时的轮询间隔
+    
+    Returns:
+        0: 两个轴都已到达目标
+    
+    Raises:
+        ValueError: 参数验证失败
+        ConnectionError: 连接失败
+        TimeoutError: 等待超时
+        RuntimeError: 操作异常
+        Exception: 其他错误
+    """
+    try:
+        logger.info(f"wait_all - 等待夹爪{id}到达位置: {target_position}mm, 角度: {target_angle}度")
+        
+        slave_instance, axes, timeout_message = _all_wait(id, target_position, target_angle, position_tolerance,
+                                                          angle_tolerance, timeout)
+        _wait_axes(id, slave_instance, axes, timeout, min_interval, check_interval, timeout_message)
+        return 0
         
     except (ValueError, ConnectionError, TimeoutError, RuntimeError):
         raise
     except Exception as e:
-        logger.error(f"wait_rotation_angle发生错误: {e}")
-        raise Exception(f"等待旋转角度失败: {e}") from e
+        logger.error(f"wait_all发生错误: {e}")
+        raise Exception(f"等待夹持和旋转失败: {e}") from e
+
+# 序列步骤允许的键
+SEQUENCE_STEP_KEYS = {"position", "speed", "angle", "rotation_speed", "wait",
+                      "position_tolerance", "angle_tolerance", "timeout", "dwell"}
+
+def _step_number(step: dict, key: str, default=None):
+    """取步骤中的数值参数并转换为float，缺省且无默认值时返回None"""
+    value = step.get(key, default)
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        raise TypeError(f"{key}应为数字，当前值: {value!r}")
+    return float(value)
+
+def _prepare_sequence(steps, timeout: float) -> list:
+    """验证序列的全部步骤并整理为内部格式，任何一步不合法时抛出ValueError"""
+    if not steps:
+        raise ValueError("序列至少需要一个步骤")
+    
+    prepared = []
+    for index, step in enumerate(steps):
+        try:
+            if not isinstance(step, dict):
+                raise TypeError(f"步骤应为dict，当前类型: {type(step).__name__}")
+            unknown = set(step) - SEQUENCE_STEP_KEYS
+            if unknown:
+                raise ValueError(f"未知的参数: {', '.join(sorted(str(key) for key in unknown))}")
+            
+            position = _step_number(step, "position")
+            speed = _step_number(step, "speed")
+            angle = _step_number(step, "angle")
+            rotation_speed = _step_number(step, "rotation_speed")
+            dwell = _step_number(step, "dwell", 0.0)
+            if position is None and angle is None and not dwell:
+                raise ValueError("步骤需要包含position、angle或dwell")
+            if position is not None:
+                if speed is None:
+                    raise ValueError("夹持步骤缺少speed")
+                _validate_move(position, speed)
+            if angle is not None:
+                if rotation_speed is None:
+                    raise ValueError("旋转步骤缺少rotation_speed")
+                _validate_rotate(angle, rotation_speed)
+            
+            position_tolerance = _step_number(step, "position_tolerance", 0.5)
+            angle_tolerance = _step_number(step, "angle_tolerance", 1.0)
+            step_timeout = _step_number(step, "timeout", timeout)
+            if position_tolerance <= 0 or angle_tolerance <= 0:
+                raise ValueError(f"容差必须大于0，当前值: {position_tolerance}, {angle_tolerance}")
+            if step_timeout <= 0 or dwell < 0:
+                raise ValueError(f"timeout必须大于0、dwell不能小于0，当前值: {step_timeout}, {dwell}")
+        except (TypeError, ValueError) as e:
+            error_msg = f"序列第{index + 1}步参数错误: {e}"
+            logger.error(error_msg)
+            raise ValueError(error_msg) from e
+        
+        prepared.append({
+            "position": position,
+            "speed": speed,
+            "angle": angle,
+            "rotation_speed": rotation_speed,
+            "wait": bool(step.get("wait", True)),
+            "position_tolerance": position_tolerance,
+            "angle_tolerance": angle_tolerance,
+            "timeout": step_timeout,
+            "dwell": dwell
+        })
+    return prepared
+
+def run_sequence(id: int, steps, timeout: float = 30.0, check_interval: float = MAX_CHECK_INTERVAL,
+                 min_interval: float = MIN_CHECK_INTERVAL) -> list:
+    """
+    按顺序执行一组夹爪运动步骤
+    
+    执行前一次性验证全部步骤，执行时只获取一次slave句柄，步骤之间不重复验证和打印INFO日志。
+    每步的目标写入后，用一个块读取轮询循环同时等待本步启动的所有轴到位；wait为False的步骤
+    不等待，下一步的写入紧接着下发。
+    
+    Args:
+        id: 夹爪ID
+        steps: 步骤列表，每步为dict:
+            position/speed: 夹持目标位置(0-20mm)和速度(1-100mm/s)
+            angle/rotation_speed: 旋转绝对角度(度)和速度(1-1080度/秒)，可与夹持同时出现
+            wait: 是否等待本步到位，默认True
+            position_tolerance/angle_tolerance: 到位容差，默认0.5mm/1.0度
+            timeout: 本步等待超时(秒)，默认使用timeout参数
+            dwell: 到位后停留时间(秒)
+        timeout: 每步默认的等待超时时间(秒)
+        check_interval: 最大检查间隔(秒)
+        min_interval: 最小检查间隔(秒)
+    
+    Returns:
+        list: 每步的耗时(毫秒)，{"step", "write_ms", "wait_ms", "dwell_ms", "total_ms"}
+    
+    Raises:
+        ValueError: 参数验证失败(执行前)
+        ConnectionError: 连接失败
+        TimeoutError: 等待超时
+        RuntimeError: 操作异常
+        Exception: 其他错误
+    """
+    prepared = _prepare_sequence(steps, timeout)
+    slave_instance = _get_slave(id)
+    logger.info(f"run_sequence - 夹爪{id}开始执行{len(prepared)}步运动序列")
+    
+    timings = []
+    sequence_start = time.perf_counter()
+    for index, step in enumerate(prepared):
+        try:
+            step_start = time.perf_counter()
+            axes = []
+            if step["position"] is not None:
+                _write_motion(slave_instance, REGISTERS["clamping_target"].address, step["position"],
+                              REGISTERS["clamping_speed_set"].address, step["speed"], "位置")
+                gripper_connections[id]['clamping_speed'] = step["speed"]
+                axes.append(_clamping_axis(id, step["position"], step["position_tolerance"]))
+            if step["angle"] is not None:
+                _write_motion(slave_instance, REGISTERS["rotation_target"].address, step["angle"],
+                              REGISTERS["rotation_speed_set"].address, step["rotation_speed"], "角度")
+                gripper_connections[id]['rotation_speed'] = step["rotation_speed"]
+                axes.append(_rotation_axis(id, step["angle"], step["angle_tolerance"]))
+            write_end = time.perf_counter()
+            
+            if axes and step["wait"]:
+                _wait_axes(id, slave_instance, axes, step["timeout"], min_interval, check_interval,
+                           f"夹爪{id}序列第{index + 1}步等待到位超时({step['timeout']}秒)", verbose=False)
+            wait_end = time.perf_counter()
+            
+            if step["dwell"]:
+                time.sleep(step["dwell"])
+            step_end = time.perf_counter()
+        except (ConnectionError, TimeoutError, RuntimeError) as e:
+            logger.error(f"夹爪{id}序列第{index + 1}步失败: {e}")
+            raise type(e)(f"序列第{index + 1}步失败: {e}") from e
+        except Exception as e:
+            logger.error(f"run_sequence发生错误: {e}")
+            raise Exception(f"序列第{index + 1}步执行失败: {e}") from e
+        
+        timing = {
+            "step": index + 1,
+            "write_ms": round((write_end - step_start) * 1000, 3),
+            "wait_ms": round((wait_end - write_end) * 1000, 3),
+            "dwell_ms": round((step_end - wait_end) * 1000, 3),
+            "total_ms": round((step_end - step_start) * 1000, 3)
+        }
+        timings.append(timing)
+        logger.debug(f"夹爪{id}序列第{index + 1}步完成: {timing}")
+    
+    logger.info(f"夹爪{id}运动序列执行完成，共{len(prepared)}步，"
+                f"耗时{(time.perf_counter() - sequence_start) * 1000:.1f}ms")
+    return timings
 
 def disconnect(id: int) -> int:
     """
@@ -569,7 +1382,8 @@ def disconnect(id: int) -> int:
     """
     try:
         if id in gripper_connections:
-            del gripper_connections[id]
+            connection = gripper_connections.pop(id)
+            bus_manager.release(connection['channel'], id)
             logger.info(f"夹爪{id}已断开连接")
             return 0
         else:
@@ -579,3 +1393,83 @@ def disconnect(id: int) -> int:
         logger.error(f"disconnect发生错误: {e}")
         raise Exception(f"断开连接失败: {e}") from e
 
+# 异步接口：总线操作在总线工作线程中执行，等待到位时用asyncio.sleep让出事件循环，
+# 同一事件循环中可以同时等待多个夹爪，或在夹爪运动期间规划机械臂运动
+
+async def _run_on_bus(func, *args, **kwargs):
+    """在总线工作线程中执行阻塞调用"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(bus_executor, functools.partial(func, *args, **kwargs))
+
+async def connect_async(id: int, baud_rate: int = 115200, parity: str = "NONE",
+                        data_bits: int = 8, stop_bits: int = 1, timeout: int = 500,
+                        channel: str = "WRIST_485_0") -> int:
+    """connect的异步版本，参数和异常同connect"""
+    return await _run_on_bus(connect, id, baud_rate, parity, data_bits, stop_bits, timeout, channel)
+
+async def move_async(id: int, position: float, speed: float, **kwargs):
+    """move的异步版本，参数和异常同move；handle=True时返回的MotionHandle可用asyncio.wrap_future等待"""
+    return await _run_on_bus(move, id, position, speed, **kwargs)
+
+async def rotate_async(id: int, angle: float, speed: float, **kwargs):
+    """rotate的异步版本，参数和异常同rotate；handle=True时返回的MotionHandle可用asyncio.wrap_future等待"""
+    return await _run_on_bus(rotate, id, angle, speed, **kwargs)
+
+async def move_and_rotate_async(id: int, position: float, clamping_speed: float,
+                                angle: float, rotation_speed: float) -> int:
+    """move_and_rotate的异步版本，参数和异常同move_and_rotate"""
+    return await _run_on_bus(move_and_rotate, id, position, clamping_speed, angle, rotation_speed)
+
+async def wait_clamping_position_async(id: int, target_position: float, tolerance: float = 0.5,
+                                       timeout: float = 30.0, check_interval: float = MAX_CHECK_INTERVAL,
+                                       min_interval: float = MIN_CHECK_INTERVAL) -> int:
+    """wait_clamping_position的异步版本，参数和异常同wait_clamping_position"""
+    try:
+        logger.info(f"wait_clamping_position_async - 等待夹爪{id}到达位置: {target_position}mm, 容差: {tolerance}mm")
+        slave_instance, axes, timeout_message = _clamping_wait(id, target_position, tolerance, timeout)
+        await _wait_axes_async(id, slave_instance, axes, timeout, min_interval, check_interval, timeout_message)
+        return 0
+        
+    except (ValueError, ConnectionError, TimeoutError, RuntimeError):
+        raise
+    except Exception as e:
+        logger.error(f"wait_clamping_position_async发生错误: {e}")
+        raise Exception(f"等待夹持位置失败: {e}") from e
+
+async def wait_rotation_angle_async(id: int, target_angle: float, tolerance: float = 1.0,
+                                    timeout: float = 30.0, check_interval: float = MAX_CHECK_INTERVAL,
+                                    min_interval: float = MIN_CHECK_INTERVAL) -> int:
+    """wait_rotation_angle的异步版本，参数和异常同wait_rotation_angle"""
+    try:
+        logger.info(f"wait_rotation_angle_async - 等待夹爪{id}到达角度: {target_angle}度, 容差: {tolerance}度")
+        slave_instance, axes, timeout_message = _rotation_wait(id, target_angle, tolerance, timeout)
+        await _wait_axes_async(id, slave_instance, axes, timeout, min_interval, check_interval, timeout_message)
+        return 0
+        
+    except (ValueError, ConnectionError, TimeoutError, RuntimeError):
+        raise
+    except Exception as e:
+        logger.error(f"wait_rotation_angle_async发生错误: {e}")
+        raise Exception(f"等待旋转角度失败: {e}") from e
+
+async def wait_all_async(id: int, target_position: float, target_angle: float,
+                         position_tolerance: float = 0.5, angle_tolerance: float = 1.0,
+                         timeout: float = 30.0, check_interval: float = MAX_CHECK_INTERVAL,
+                         min_interval: float = MIN_CHECK_INTERVAL) -> int:
+    """wait_all的异步版本，参数和异常同wait_all"""
+    try:
+        logger.info(f"wait_all_async - 等待夹爪{id}到达位置: {target_position}mm, 角度: {target_angle}度")
+        slave_instance, axes, timeout_message = _all_wait(id, target_position, target_angle, position_tolerance,
+                                                          angle_tolerance, timeout)
+        await _wait_axes_async(id, slave_instance, axes, timeout, min_interval, check_interval, timeout_message)
+        return 0
+        
+    except (ValueError, ConnectionError, TimeoutError, RuntimeError):
+        raise
+    except Exception as e:
+        logger.error(f"wait_all_async发生错误: {e}")
+        raise Exception(f"等待夹持和旋转失败: {e}") from e
+
+async def disconnect_async(id: int) -> int:
+    """disconnect的异步版本"""
+    return await _run_on_bus(disconnect, id)
@@ -0,0 +1,226 @@
+"""
+HL/HLUI热点路径基准测试
+
+基于sim/中的模拟SDK运行，不需要控制器。每个用例报告每次操作的总线事务数和耗时分位数，
+并与bench/baseline.json比较：总线事务数超过基线(含容差)时以非零退出码失败，耗时只做对比展示。
+
+    python bench/bench.py                        # 运行并与基线比较
+    python bench/bench.py --latency-ms 10        # 模拟更慢的总线
+    python bench/bench.py --clients 32           # HTTP并发客户端数
+    python bench/bench.py --update-baseline      # 用本次结果覆盖基线
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HLUI_DIR = os.path.join(ROOT, "HLUI", "HLUI")
+HL_DIR = os.path.join(ROOT, "HLZL", "HL")
+BASELINE_PATH = os.path.join(ROOT, "bench", "baseline.json")
+
+sys.path[:0] = [os.path.join(ROOT, "sim"), HLUI_DIR, HL_DIR]
+
+from Agilebot.IR.A import simulator  # noqa: E402
+
+def bus_transactions() -> int:
+    """所有模拟夹爪累计处理的事务数"""
+    return sum(gripper.transactions for gripper in simulator.controller.grippers.values())
+
+def percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+def summarize(name: str, durations, transactions: int, operations: int, **extra) -> dict:
+    """整理单个用例的结果，耗时单位为毫秒"""
+    result = {
+        "name": name,
+        "operations": operations,
+        "bus_transactions": round(transactions / operations, 2),
+        "p50_ms": round(percentile(durations, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(durations, 0.95) * 1000, 4),
+        "p99_ms": round(percentile(durations, 0.99) * 1000, 4),
+    }
+    result.update(extra)
+    return result
+
+def measure(name: str, func, iterations: int) -> dict:
+    durations = []
+    before = bus_transactions()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return summarize(name, durations, bus_transactions() - before, iterations)
+
+async def measure_async(name: str, func, iterations: int) -> dict:
+    durations = []
+    before = bus_transactions()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await func()
+        durations.append(time.perf_counter() - start)
+    return summarize(name, durations, bus_transactions() - before, iterations)
+
+def load_hlui():
+    # HLUI按相对路径加载模板和静态文件
+    os.chdir(HLUI_DIR)
+    import app as hlui
+    return hlui
+
+def bench_modbus_helper(hlui, iterations: int) -> list:
+    helper = hlui.ModbusHelper
+    registers = helper.float_to_registers(12.5)
+    layout = hlui.RECORDER_LAYOUT
+    block = [0] * hlui.RECORDER_REGISTER_COUNT
+    return [
+        measure("modbus_helper.float_to_registers", lambda: helper.float_to_registers(12.5), iterations),
+        measure("modbus_helper.registers_to_float", lambda: helper.registers_to_float(registers), iterations),
+        measure("register_layout.decode", lambda: layout.decode(block), iterations),
+    ]
+
+async def bench_read_all_status(hlui, iterations: int) -> list:
+    async def cold():
+        hlui.register_cache.clear()
+        await hlui.read_all_status()
+
+    await hlui.read_all_status()  # 预热
+    return [
+        await measure_async("hlui.read_all_status.cold", cold, iterations),
+        await measure_async("hlui.read_all_status.warm", hlui.read_all_status, iterations),
+    ]
+
+async def bench_http(hlui, clients: int, requests_per_client: int, path: str = "/read_all_status") -> dict:
+    """N个并发面板客户端持续轮询同一接口"""
+    import httpx
+
+    durations = []
+    errors = 0
+    transport = httpx.ASGITransport(app=hlui.app)
+
+    async def client():
+        nonlocal errors
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as session:
+            for _ in range(requests_per_client):
+                start = time.perf_counter()
+                response = await session.get(path)
+                durations.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+    before = bus_transactions()
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    total = clients * requests_per_client
+    return summarize(f"hlui.http{path}.c{clients}", durations, bus_transactions() - before, total,
+                     requests_per_second=round(total / elapsed, 1), errors=errors)
+
+def bench_hl_cycle(iterations: int) -> list:
+    import HL
+
+    if HL.connect(1) != 0:
+        raise RuntimeError("HL连接模拟夹爪失败")
+    targets = [5.0, 15.0]
+    state = {"index": 0}
+
+    def cycle():
+        target = targets[state["index"] % len(targets)]
+        state["index"] += 1
+        HL.move(1, target, 100)
+        HL.wait_clamping_position(1, target)
+
+    try:
+        return [measure("hl.move+wait_clamping_position", cycle, iterations)]
+    finally:
+        HL.disconnect(1)
+
+def compare(results: list, baseline: dict, tolerance: float) -> list:
+    """返回总线事务数超出基线的用例说明"""
+    failures = []
+    cases = baseline.get("cases", {})
+    for result in results:
+        reference = cases.get(result["name"])
+        if reference is None:
+            result["baseline"] = None
+            continue
+        result["baseline"] = reference
+        limit = reference["bus_transactions"] * (1 + tolerance)
+        if result["bus_transactions"] > limit + 1e-9:
+            failures.append(f"{result['name']}: 每次操作{result['bus_transactions']}次总线事务，"
+                            f"基线{reference['bus_transactions']}(容差{tolerance:.0%})")
+    return failures
+
+def print_table(results: list):
+    print(f"{'用例':<42}{'事务/次':>10}{'基线':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'基线p50':>10}")
+    for result in results:
+        reference = result.get("baseline") or {}
+        print(f"{result['name']:<42}{result['bus_transactions']:>10}{reference.get('bus_transactions', '-'):>10}"
+              f"{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}{reference.get('p50_ms', '-'):>10}")
+        if "requests_per_second" in result:
+            print(f"{'':<42}吞吐 {result['requests_per_second']} req/s，错误 {result['errors']}")
+
+async def run_hlui(hlui, args) -> list:
+    # 不启动startup中的后台轮询，保证事务计数只来自被测操作
+    success, message = hlui.connect_robot()
+    if not success or not await hlui.check_modbus_connection():
+        raise RuntimeError(f"HLUI连接模拟夹爪失败: {message}")
+    results = bench_modbus_helper(hlui, args.helper_iterations)
+    results += await bench_read_all_status(hlui, args.iterations)
+    results.append(await bench_http(hlui, args.clients, args.requests))
+    await hlui.run_on_bus(hlui.disconnect_robot, priority=hlui.PRIORITY_WRITE)
+    hlui.bus_scheduler.shutdown()
+    return results
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="HL/HLUI热点路径基准测试")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="模拟总线单次事务延迟")
+    parser.add_argument("--jitter-ms", type=float, default=0.5, help="模拟延迟抖动")
+    parser.add_argument("--iterations", type=int, default=30, help="总线用例的重复次数")
+    parser.add_argument("--helper-iterations", type=int, default=20000, help="纯计算用例的重复次数")
+    parser.add_argument("--clients", type=int, default=8, help="HTTP并发客户端数")
+    parser.add_argument("--requests", type=int, default=20, help="每个HTTP客户端的请求数")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="总线事务数相对基线的容差")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="基线文件")
+    parser.add_argument("--update-baseline", action="store_true", help="用本次结果覆盖基线")
+    parser.add_argument("--json", help="把结果另存为JSON")
+    args = parser.parse_args()
+
+    simulator.configure(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=0)
+    hlui = load_hlui()
+    results = asyncio.run(run_hlui(hlui, args))
+    simulator.reset()
+    results += bench_hl_cycle(args.iterations)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    failures = compare(results, baseline, args.tolerance)
+    print_table(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.update_baseline:
+        cases = {result["name"]: {key: result[key] for key in ("bus_transactions", "p50_ms", "p99_ms")}
+                 for result in results}
+        settings = {"latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "clients": args.clients}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"settings": settings, "cases": cases}, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"基线已更新: {args.baseline}")
+        return 0
+
+    if failures:
+        print("\n总线事务数回归:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
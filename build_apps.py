@@ -0,0 +1,53 @@
+"""
+打包HLUI和HL应用
+
+每个应用打包为独立的gbtapp(tar.gz，成员为应用目录下的文件)，common/gripper_common.py
+会一并打包到应用根目录，两个应用在控制器上各自从应用目录导入这份共用模块。
+
+    python build_apps.py            # 打包两个应用
+    python build_apps.py HL         # 只打包HL
+"""
+import os
+import sys
+import tarfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+COMMON_MODULES = [os.path.join(ROOT, "common", "gripper_common.py")]
+# 应用名 -> (应用目录, 输出文件)
+APPS = {
+    "HLUI": (os.path.join(ROOT, "HLUI", "HLUI"), os.path.join(ROOT, "HLUI", "HLUI.gbtapp")),
+    "HL": (os.path.join(ROOT, "HLZL", "HL"), os.path.join(ROOT, "HLZL", "HL.gbtapp")),
+}
+# 不打包的目录: 运行时生成的缓存和现场保存的参数配置
+EXCLUDED_DIRS = {"__pycache__", "profiles"}
+
+def build(name: str) -> str:
+    """打包一个应用，返回输出文件路径"""
+    app_dir, output = APPS[name]
+    # 应用目录中残留的共用模块副本不打包，以common目录中的为准
+    common_names = {os.path.basename(module) for module in COMMON_MODULES}
+    with tarfile.open(output, "w:gz") as archive:
+        archive.add(app_dir, arcname=".", recursive=False)
+        for current, dirs, files in os.walk(app_dir):
+            dirs[:] = sorted(d for d in dirs if d not in EXCLUDED_DIRS)
+            entries = dirs + [f for f in sorted(files) if not f.endswith(".pyc") and
+                              not (current == app_dir and f in common_names)]
+            for entry in entries:
+                path = os.path.join(current, entry)
+                archive.add(path, arcname=os.path.relpath(path, app_dir), recursive=False)
+        for module in COMMON_MODULES:
+            archive.add(module, arcname=os.path.basename(module))
+    return output
+
+def main() -> int:
+    names = sys.argv[1:] or list(APPS)
+    unknown = [name for name in names if name not in APPS]
+    if unknown:
+        print(f"未知的应用: {', '.join(unknown)}，可选: {', '.join(APPS)}")
+        return 1
+    for name in names:
+        print(f"{name}: {build(name)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,389 @@
+"""
+HL和HLUI共用的夹爪寄存器工具
+
+两个应用分别打包为独立的gbtapp，本模块由build_apps.py打包进各自的应用目录；
+在仓库中运行时两个应用从common目录导入。
+"""
+import functools
+import struct
+import threading
+import time
+
+from Agilebot.IR.A.status_code import StatusCodeEnum
+
+class ModbusHelper:
+    """Modbus通信辅助类"""
+    
+    _FLOAT = struct.Struct('>f')
+    _WORDS = struct.Struct('>HH')
+    
+    @staticmethod
+    def float_to_registers(float_value):
+        """将浮点数转换为两个16位寄存器"""
+        return list(ModbusHelper._WORDS.unpack(ModbusHelper._FLOAT.pack(float_value)))
+    
+    @staticmethod
+    def registers_to_float(registers):
+        """将两个16位寄存器转换为浮点数，批量解码请使用RegisterLayout"""
+        if len(registers) != 2:
+            raise ValueError("需要2个寄存器值来转换为浮点数")
+        
+        return ModbusHelper._FLOAT.unpack(ModbusHelper._WORDS.pack(registers[0], registers[1]))[0]
+
+class RegisterLayout:
+    """
+    寄存器块批量解码布局
+    
+    按字段地址预编译一个大端struct.Struct，int字段对应H、float字段对应f(占两个寄存器)，
+    字段之间的空闲寄存器用填充字节跳过，一次unpack解出块内所有字段。
+    """
+    
+    def __init__(self, start: int, count: int, fields):
+        """
+        Args:
+            start: 块起始地址
+            count: 块寄存器数量
+            fields: [(名称, 地址, "int"/"float")]
+        """
+        fmt = ">"
+        position = start
+        names = []
+        for name, address, kind in sorted(fields, key=lambda field: field[1]):
+            if address < position:
+                raise ValueError(f"字段{name}(0x{address:02X})与前一字段重叠或不在块内")
+            fmt += "xx" * (address - position) + ("f" if kind == "float" else "H")
+            position = address + (2 if kind == "float" else 1)
+            names.append(name)
+        if position > start + count:
+            raise ValueError(f"字段超出块范围0x{start:02X}-0x{start + count - 1:02X}")
+        fmt += "xx" * (start + count - position)
+        
+        self.start = start
+        self.count = count
+        self.names = tuple(names)  # 按地址排序的字段名
+        self._fields = struct.Struct(fmt)
+        self._words = struct.Struct(f">{count}H")
+    
+    def unpack(self, registers) -> tuple:
+        """解码整个块，registers可以是寄存器值列表或大端字节缓冲区，按地址顺序返回字段值"""
+        if isinstance(registers, (bytes, bytearray, memoryview)):
+            return self._fields.unpack_from(registers)
+        return self._fields.unpack(self._words.pack(*registers))
+    
+    def decode(self, registers) -> dict:
+        """解码整个块，返回{名称: 值}"""
+        return dict(zip(self.names, self.unpack(registers)))
+
+@functools.lru_cache(maxsize=64)
+def register_layout(start: int, count: int, fields: tuple) -> RegisterLayout:
+    """获取块解码布局，相同的块和字段表复用同一个预编译布局(fields需为元组)"""
+    return RegisterLayout(start, count, fields)
+
+# 寄存器缓存有效期(秒)，按寄存器类别划分
+REGISTER_TTL_TELEMETRY = 0.2  # 0x40-0x4F 实时反馈
+REGISTER_TTL_CONTROL = 2.0  # 0x00-0x3F 控制/设定值
+REGISTER_TTL_CONFIG = 30.0  # 0x80-0x9F 配置参数
+
+def default_ttl(address: int) -> float:
+    """按地址区段获取寄存器的默认缓存有效期"""
+    if 0x40 <= address <= 0x4F:
+        return REGISTER_TTL_TELEMETRY
+    if address >= 0x80:
+        return REGISTER_TTL_CONFIG
+    return REGISTER_TTL_CONTROL
+
+class RegisterField:
+    """
+    寄存器映射中的一个字段
+    
+    Args:
+        name: 字段名
+        address: 寄存器地址
+        kind: "int"(占1个寄存器)或"float"(占2个寄存器，大端)
+        access: "r"、"w"或"rw"
+        label: 中文名称
+        minimum/maximum: 允许写入的范围
+        choices: 允许写入的值，与范围二选一
+        range_message: 写入值不合法时的提示
+        status_text: {值: 显示文本}
+        default_text: status_text中未列出的值的显示文本，可引用{value}
+        none_text: 读取失败时的显示文本
+        ttl: 缓存有效期(秒)，默认按地址区段
+        command: 命令寄存器，写入触发一次动作，读回值不代表写入值
+        motion: 写入后夹爪开始运动
+        param: 写接口的表单参数名
+        read_route/write_route: HLUI生成的读/写接口名，None表示不生成
+        text_key: 读接口中显示文本的键名
+    """
+    
+    def __init__(self, name: str, address: int, kind: str, access: str, label: str,
+                 minimum=None, maximum=None, choices=None, range_message: str = None,
+                 status_text: dict = None, default_text: str = "未知", none_text: str = "未知",
+                 ttl: float = None, command: bool = False, motion: bool = False,
+                 param: str = "value", read_route: str = None, write_route: str = None,
+                 text_key: str = "status_text"):
+        self.name = name
+        self.address = address
+        self.kind = kind
+        self.access = access
+        self.label = label
+        self.minimum = minimum
+        self.maximum = maximum
+        self.choices = tuple(choices) if choices is not None else None
+        self.range_message = range_message
+        self.status_text = status_text
+        self.default_text = default_text
+        self.none_text = none_text
+        self.ttl = default_ttl(address) if ttl is None else ttl
+        self.command = command
+        self.motion = motion
+        self.param = param
+        self.read_route = read_route
+        self.write_route = write_route
+        self.text_key = text_key
+    
+    @property
+    def width(self) -> int:
+        """占用的寄存器数量"""
+        return 2 if self.kind == "float" else 1
+    
+    def validate(self, value):
+        """检查写入值，合法时返回None，否则返回提示信息"""
+        if self.choices is not None:
+            valid = value in self.choices
+        else:
+            valid = ((self.minimum is None or value >= self.minimum) and
+                     (self.maximum is None or value <= self.maximum))
+        return None if valid else self.range_message
+    
+    def text(self, value):
+        """获取值的显示文本，没有定义status_text时返回None"""
+        if self.status_text is None:
+            return None
+        if value is None:
+            return self.none_text
+        return self.status_text.get(value, self.default_text.format(value=value))
+
+# 波特率编号 -> 波特率
+BAUD_RATE_MAP = {
+    0: 9600,
+    1: 19200,
+    2: 38400,
+    3: 57600,
+    4: 115200,
+    5: 153600,
+    6: 256000
+}
+
+# 夹爪寄存器映射，地址、类型、读写权限、缓存有效期、读写接口和显示文本都以此为准
+REGISTER_MAP = (
+    # 控制/设定值
+    RegisterField("gripper_init", 0x00, "int", "w", "夹爪初始化", choices=(0, 1), command=True, motion=True),
+    RegisterField("clamping_target", 0x02, "float", "w", "加持位置", minimum=0, maximum=20,
+                  range_message="加持位置范围应为0-20mm", motion=True, param="position",
+                  write_route="write_clamping_position"),
+    RegisterField("clamping_speed_set", 0x04, "float", "w", "加持速度", minimum=1, maximum=100,
+                  range_message="加持速度范围应为1-100mm/s", motion=True, param="speed",
+                  write_route="write_clamping_speed"),
+    RegisterField("clamping_current_set", 0x06, "float", "rw", "加持电流", minimum=0.1, maximum=0.5,
+                  range_message="加持电流范围应为0.1-0.5A", param="current", write_route="write_clamping_current"),
+    RegisterField("rotation_target", 0x0A, "float", "w", "旋转绝对角度", minimum=-3600000, maximum=3600000,
+                  range_message="旋转角度范围应为-3600000-3600000度", motion=True, param="angle",
+                  write_route="write_rotation_angle"),
+    RegisterField("rotation_speed_set", 0x0E, "float", "w", "旋转速度", minimum=1, maximum=1080,
+                  range_message="旋转速度范围应为1-1080度/秒", motion=True, param="speed",
+                  write_route="write_rotation_speed"),
+    RegisterField("rotation_current_set", 0x14, "float", "w", "旋转电流", minimum=0.2, maximum=1.0,
+                  range_message="旋转电流范围应为0.2-1.0A", param="current", write_route="write_rotation_current"),
+    RegisterField("motor_enable", 0x16, "int", "rw", "电机使能", choices=(0, 1),
+                  range_message="电机使能值应为0或1", status_text={0: "关闭", 1: "使能"}, param="enable",
+                  read_route="read_motor_enable", write_route="write_motor_enable"),
+    # 实时反馈
+    RegisterField("gripper_init_status", 0x40, "int", "r", "夹爪初始化状态",
+                  status_text={0: "未初始化", 5: "初始化完成"}, default_text="初始化中({value})",
+                  none_text="读取失败", read_route="read_gripper_init_status"),
+    RegisterField("clamping_status", 0x41, "int", "r", "夹持状态",
+                  status_text={0: "到位", 1: "运动中", 2: "加持中", 3: "掉落"}, default_text="未知状态({value})",
+                  none_text="读取失败", read_route="read_clamping_status"),
+    RegisterField("clamping_position", 0x42, "float", "r", "加持位置反馈", read_route="read_clamping_position"),
+    RegisterField("clamping_speed", 0x44, "float", "r", "加持速度反馈", read_route="read_clamping_speed"),
+    RegisterField("clamping_current", 0x46, "float", "r", "加持电流反馈", read_route="read_clamping_current"),
+    RegisterField("rotation_status", 0x48, "int", "r", "旋转状态反馈",
+                  status_text={0: "到位", 1: "旋转中", 2: "旋转受阻", 3: "掉落", 4: "堵转停转"},
+                  default_text="未知状态({value})", none_text="读取失败", read_route="read_rotation_status"),
+    RegisterField("rotation_angle", 0x4A, "float", "r", "旋转角度反馈", read_route="read_rotation_angle"),
+    RegisterField("rotation_speed", 0x4C, "float", "r", "旋转速度反馈", read_route="read_rotation_speed"),
+    RegisterField("rotation_current", 0x4E, "float", "r", "旋转电流反馈", read_route="read_rotation_current"),
+    # 配置参数
+    RegisterField("gripper_id", 0x80, "int", "rw", "夹爪ID", minimum=1, maximum=247,
+                  range_message="夹爪ID范围应为1-247", param="gripper_id",
+                  read_route="read_gripper_id", write_route="write_gripper_id"),
+    RegisterField("baud_rate", 0x81, "int", "rw", "夹爪波特率", choices=tuple(BAUD_RATE_MAP),
+                  range_message=f"波特率编号范围应为0-{max(BAUD_RATE_MAP)}", status_text=BAUD_RATE_MAP,
+                  param="baud_rate",
+                  read_route="read_baud_rate", write_route="write_baud_rate", text_key="baud_value"),
+    RegisterField("init_direction", 0x82, "int", "rw", "初始化方向设置", choices=(0, 1),
+                  range_message="初始化方向值应为0或1", status_text={0: "张开校准", 1: "闭合校准"},
+                  param="direction", read_route="read_init_direction", write_route="write_init_direction"),
+    RegisterField("auto_init", 0x83, "int", "rw", "自动初始化设置", choices=(0, 1),
+                  range_message="自动初始化值应为0或1", status_text={0: "上电自动校准", 1: "手动校准"},
+                  param="auto_init", read_route="read_auto_init", write_route="write_auto_init"),
+    RegisterField("save_params", 0x84, "int", "rw", "保存参数设置", choices=(0, 1),
+                  range_message="保存参数值应为0或1", status_text={0: "未保存", 1: "已保存"}, command=True,
+                  param="save", read_route="read_save_params", write_route="write_save_params"),
+    RegisterField("reset_rotation", 0x8F, "int", "w", "复位多圈转动值", choices=(0, 1),
+                  range_message="复位值应为0或1", command=True, param="reset", write_route="write_reset_rotation"),
+    RegisterField("rotation_stop_enable", 0x9E, "int", "rw", "旋转堵停使能", choices=(0, 1),
+                  range_message="旋转堵停使能值应为0或1", status_text={0: "不使能", 1: "使能"}, param="enable",
+                  read_route="read_rotation_stop_enable", write_route="write_rotation_stop_enable"),
+    RegisterField("rotation_stop_sensitivity", 0x9F, "int", "rw", "旋转堵停灵敏度", minimum=0, maximum=100,
+                  range_message="灵敏度范围应为0-100", param="sensitivity",
+                  read_route="read_rotation_stop_sensitivity", write_route="write_rotation_stop_sensitivity"),
+)
+
+REGISTERS = {field.name: field for field in REGISTER_MAP}
+
+# 寄存器地址 -> 缓存有效期，双寄存器字段的两个地址相同
+REGISTER_TTL = {field.address + i: field.ttl for field in REGISTER_MAP for i in range(field.width)}
+
+# Modbus事务延迟直方图的桶上限(秒)
+LATENCY_BUCKETS = (0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0)
+
+class BusMetrics:
+    """
+    Modbus总线事务指标
+    
+    按操作(read/write)和起始寄存器地址统计延迟直方图、结果计数(ok/timeout/error)
+    和传输字节数，可输出Prometheus文本格式。
+    """
+    
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._series = {}  # (op, address) -> 统计数据
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def classify(status) -> str:
+        """根据SDK返回的状态码判断事务结果"""
+        if status == StatusCodeEnum.OK:
+            return "ok"
+        text = f"{getattr(status, 'name', '')} {getattr(status, 'errmsg', '')}".lower()
+        if "timeout" in text or "超时" in text:
+            return "timeout"
+        return "error"
+    
+    def call(self, op: str, address: int, count: int, func, *args):
+        """执行一次读写并记录指标，read返回(regs, status)，write返回status"""
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+        except Exception as e:
+            outcome = "timeout" if isinstance(e, TimeoutError) or "timeout" in str(e).lower() else "error"
+            self.observe(op, address, count, time.perf_counter() - start, outcome)
+            raise
+        status = result[1] if op == "read" else result
+        self.observe(op, address, count, time.perf_counter() - start, self.classify(status))
+        return result
+    
+    def observe(self, op: str, address: int, count: int, elapsed: float, outcome: str):
+        """记录一次事务，count为寄存器数量"""
+        with self._lock:
+            series = self._series.get((op, address))
+            if series is None:
+                series = {
+                    "buckets": [0] * (len(self.buckets) + 1),
+                    "sum": 0.0,
+                    "count": 0,
+                    "outcomes": {"ok": 0, "timeout": 0, "error": 0},
+                    "bytes": 0
+                }
+                self._series[(op, address)] = series
+            index = len(self.buckets)
+            for i, bound in enumerate(self.buckets):
+                if elapsed <= bound:
+                    index = i
+                    break
+            series["buckets"][index] += 1
+            series["sum"] += elapsed
+            series["count"] += 1
+            series["outcomes"][outcome] = series["outcomes"].get(outcome, 0) + 1
+            if outcome == "ok":
+                series["bytes"] += count * 2
+    
+    def _quantile(self, buckets, total: int, q: float):
+        # 按直方图估算分位数，在所在桶内按上下限线性插值；
+        # 落在最后一个溢出桶时无法插值，取最大的有限上限
+        if total == 0:
+            return None
+        rank = q * total
+        seen = 0
+        for i, n in enumerate(buckets):
+            if n and seen + n >= rank:
+                if i >= len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+    
+    def _collect(self):
+        # 在锁内复制统计数据，按(op, address)排序
+        with self._lock:
+            return sorted((key, dict(series, buckets=list(series["buckets"]), outcomes=dict(series["outcomes"])))
+                          for key, series in self._series.items())
+    
+    def snapshot(self):
+        """获取各寄存器的统计摘要，延迟单位为毫秒，分位数由直方图桶内插值估算"""
+        result = []
+        for (op, address), series in self._collect():
+            count = series["count"]
+            p50 = self._quantile(series["buckets"], count, 0.5)
+            p99 = self._quantile(series["buckets"], count, 0.99)
+            result.append({
+                "op": op,
+                "address": f"0x{address:02X}",
+                "count": count,
+                "avg_ms": round(series["sum"] / count * 1000, 3) if count else None,
+                "p50_ms": None if p50 is None else round(p50 * 1000, 3),
+                "p99_ms": None if p99 is None else round(p99 * 1000, 3),
+                "timeouts": series["outcomes"]["timeout"],
+                "errors": series["outcomes"]["error"],
+                "bytes": series["bytes"]
+            })
+        return result
+    
+    def render(self, prefix: str = "modbus") -> str:
+        """输出Prometheus文本格式"""
+        items = self._collect()
+        lines = [
+            f"# HELP {prefix}_request_duration_seconds Modbus事务延迟",
+            f"# TYPE {prefix}_request_duration_seconds histogram"
+        ]
+        for (op, address), series in items:
+            labels = f'op="{op}",address="0x{address:02X}"'
+            cumulative = 0
+            for bound, n in zip(self.buckets + (None,), series["buckets"]):
+                cumulative += n
+                le = "+Inf" if bound is None else repr(bound)
+                lines.append(f'{prefix}_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{prefix}_request_duration_seconds_sum{{{labels}}} {series['sum']:.6f}")
+            lines.append(f"{prefix}_request_duration_seconds_count{{{labels}}} {series['count']}")
+        lines += [
+            f"# HELP {prefix}_requests_total Modbus事务次数(按结果)",
+            f"# TYPE {prefix}_requests_total counter"
+        ]
+        for (op, address), series in items:
+            for outcome, n in series["outcomes"].items():
+                lines.append(f'{prefix}_requests_total{{op="{op}",address="0x{address:02X}",outcome="{outcome}"}} {n}')
+        lines += [
+            f"# HELP {prefix}_bytes_total Modbus成功传输的寄存器字节数",
+            f"# TYPE {prefix}_bytes_total counter"
+        ]
+        for (op, address), series in items:
+            lines.append(f'{prefix}_bytes_total{{op="{op}",address="0x{address:02X}"}} {series["bytes"]}')
+        return "\n".join(lines) + "\n"
+    
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._series.clear()
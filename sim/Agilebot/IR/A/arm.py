@@ -0,0 +1,111 @@
+"""模拟的Agilebot.IR.A.arm，接口与真实SDK一致，数据来自simulator"""
+import threading
+
+from . import simulator
+from .sdk_types import SignalType, SignalValue
+from .status_code import StatusCodeEnum
+
+class _SimSlave:
+    """模拟的Modbus从站"""
+    
+    def __init__(self, arm, channel, id: int):
+        self._arm = arm
+        self._channel = channel
+        self._gripper = simulator.gripper(id, channel)
+    
+    def _check(self):
+        # 返回None表示可以通信，否则返回错误状态码
+        if not self._arm.is_connect():
+            return StatusCodeEnum.NOT_CONNECTED
+        params = simulator.controller.channel_params.get(simulator._channel_name(self._channel))
+        if params is None:
+            return StatusCodeEnum.MODBUS_NOT_CONFIGURED
+        if simulator.transaction_delay(params.timeout) or params.baud != self._gripper.baud_rate:
+            # 波特率与夹爪不一致时从站不应答
+            return StatusCodeEnum.MODBUS_TIMEOUT
+        return None
+    
+    def read_holding_regs(self, address: int, count: int):
+        error = self._check()
+        if error is not None:
+            return [], error
+        registers = self._gripper.read(address, count)
+        if registers is None:
+            return [], StatusCodeEnum.MODBUS_ILLEGAL_ADDRESS
+        return registers, StatusCodeEnum.OK
+    
+    def write_holding_regs(self, address: int, registers):
+        error = self._check()
+        if error is not None:
+            return error
+        if not self._gripper.write(address, registers):
+            return StatusCodeEnum.MODBUS_ILLEGAL_ADDRESS
+        return StatusCodeEnum.OK
+
+class _SimModbus:
+    
+    def __init__(self, arm):
+        self._arm = arm
+        self._next_id = 0
+    
+    def set_parameter(self, params):
+        if not self._arm.is_connect():
+            return -1, StatusCodeEnum.NOT_CONNECTED
+        if params.channel is None:
+            return -1, StatusCodeEnum.INVALID_PARAMETER
+        simulator.controller.channel_params[simulator._channel_name(params.channel)] = params
+        self._next_id += 1
+        return self._next_id, StatusCodeEnum.OK
+    
+    def get_slave(self, channel, id: int, modbus_id: int = 1):
+        return _SimSlave(self._arm, channel, id)
+
+class _SimSignals:
+    
+    def __init__(self, arm):
+        self._arm = arm
+    
+    def _table(self, signal_type):
+        controller = simulator.controller
+        return controller.digital_outputs if signal_type == SignalType.DO else controller.digital_inputs
+    
+    def read(self, signal_type, number: int):
+        if not self._arm.is_connect():
+            return None, StatusCodeEnum.NOT_CONNECTED
+        if number < 1:
+            return None, StatusCodeEnum.INVALID_PARAMETER
+        simulator.transaction_delay(500)
+        return self._table(signal_type).get(number, SignalValue.OFF), StatusCodeEnum.OK
+    
+    def write(self, signal_type, number: int, value):
+        if not self._arm.is_connect():
+            return StatusCodeEnum.NOT_CONNECTED
+        if signal_type != SignalType.DO or number < 1:
+            return StatusCodeEnum.INVALID_PARAMETER
+        simulator.transaction_delay(500)
+        self._table(signal_type)[number] = value
+        return StatusCodeEnum.OK
+
+class Arm:
+    """模拟的机械臂控制器连接"""
+    
+    def __init__(self):
+        self._connected = False
+        self._lock = threading.Lock()
+        self.modbus = _SimModbus(self)
+        self.signals = _SimSignals(self)
+    
+    def connect(self, ip: str):
+        if simulator.config.controller_down:
+            return StatusCodeEnum.CONNECT_FAILED
+        with self._lock:
+            self._connected = True
+            simulator.controller.connections += 1
+        return StatusCodeEnum.OK
+    
+    def disconnect(self):
+        with self._lock:
+            self._connected = False
+    
+    def is_connect(self) -> bool:
+        return self._connected and not simulator.config.controller_down
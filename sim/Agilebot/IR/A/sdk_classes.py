@@ -0,0 +1,21 @@
+class SerialParams:
+    """Modbus串口参数"""
+    
+    def __init__(self, channel=None, ip: str = "", port: int = 502, baud: int = 115200, data_bit: int = 8,
+                 stop_bit: int = 1, parity=None, timeout: int = 500):
+        self.channel = channel
+        self.ip = ip
+        self.port = port
+        self.baud = baud
+        self.data_bit = data_bit
+        self.stop_bit = stop_bit
+        self.parity = parity
+        self.timeout = timeout
+
+class Register:
+    """寄存器(与真实SDK同名，模拟器中不使用)"""
+    
+    def __init__(self, id: int = 0, value=0, name: str = ""):
+        self.id = id
+        self.value = value
+        self.name = name
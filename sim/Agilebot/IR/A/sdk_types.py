@@ -0,0 +1,20 @@
+from enum import Enum
+
+class ModbusChannel(Enum):
+    WRIST_485_0 = 0
+    WRIST_485_1 = 1
+    CONTROLLER_485 = 2
+    TCP = 3
+
+class ModbusParity(Enum):
+    NONE = 0
+    ODD = 1
+    EVEN = 2
+
+class SignalType(Enum):
+    DI = 0
+    DO = 1
+
+class SignalValue(Enum):
+    OFF = 0
+    ON = 1
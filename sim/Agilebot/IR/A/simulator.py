@@ -0,0 +1,287 @@
+"""
+夹爪/控制器模拟器
+
+模拟0x00-0x9F夹爪寄存器、夹持和旋转运动、总线延迟以及超时和掉落/堵转故障。
+参数可通过环境变量或configure()设置:
+
+    HL_SIM_LATENCY_MS: 每次事务的基础延迟(毫秒)，默认5
+    HL_SIM_JITTER_MS: 延迟的随机抖动(毫秒)，默认2
+    HL_SIM_TIMEOUT_RATE: 事务超时的概率(0-1)，默认0
+    HL_SIM_CONTROLLER_DOWN: 为1时控制器拒绝连接
+
+示例:
+    from Agilebot.IR.A import simulator
+    simulator.configure(latency_ms=10, timeout_rate=0.01)
+    simulator.gripper(1).inject_fault("drop")
+"""
+import os
+import random
+import struct
+import threading
+import time
+
+REGISTER_COUNT = 0xA0
+BAUD_RATES = (9600, 19200, 38400, 57600, 115200, 153600, 256000)
+INIT_DURATION = 0.5  # 初始化耗时(秒)
+CLAMPING_RANGE = (0.0, 20.0)  # 行程(mm)
+MAX_TIMEOUT_SLEEP = 0.5  # 模拟超时时的最长等待(秒)，避免压测时间过长
+
+class SimConfig:
+    """模拟器全局参数"""
+    
+    def __init__(self):
+        self.latency_ms = float(os.getenv("HL_SIM_LATENCY_MS", "5"))
+        self.jitter_ms = float(os.getenv("HL_SIM_JITTER_MS", "2"))
+        self.timeout_rate = float(os.getenv("HL_SIM_TIMEOUT_RATE", "0"))
+        self.controller_down = os.getenv("HL_SIM_CONTROLLER_DOWN", "0") == "1"
+        self.seed = None
+
+config = SimConfig()
+_random = random.Random()
+
+def configure(latency_ms: float = None, jitter_ms: float = None, timeout_rate: float = None,
+              controller_down: bool = None, seed: int = None):
+    """修改模拟参数，未传入的参数保持不变"""
+    if latency_ms is not None:
+        config.latency_ms = latency_ms
+    if jitter_ms is not None:
+        config.jitter_ms = jitter_ms
+    if timeout_rate is not None:
+        config.timeout_rate = timeout_rate
+    if controller_down is not None:
+        config.controller_down = controller_down
+    if seed is not None:
+        config.seed = seed
+        _random.seed(seed)
+
+def _float_to_words(value: float):
+    return list(struct.unpack(">HH", struct.pack(">f", value)))
+
+def _words_to_float(words) -> float:
+    return struct.unpack(">f", struct.pack(">HH", words[0], words[1]))[0]
+
+class _Axis:
+    """一个运动轴，反馈值按设定速度匀速趋近目标"""
+    
+    def __init__(self, target_address: int, speed_address: int, current_set_address: int, status_address: int,
+                 value_address: int, limits=None):
+        self.target_address = target_address
+        self.speed_address = speed_address
+        self.current_set_address = current_set_address
+        self.status_address = status_address
+        self.value_address = value_address
+        self.limits = limits
+        self.value = 0.0
+        self.target = 0.0
+        self.velocity = 0.0
+        self.status = 0
+        self.fault = None  # 注入的故障状态码
+
+class GripperSimulator:
+    """
+    单个夹爪的寄存器和运动模型
+    
+    写入目标寄存器(0x02/0x0A)后对应轴开始运动，反馈寄存器(0x42/0x4A)在每次访问时按经过的
+    时间推进；object_width设置后夹持在该位置受阻进入"加持中"。
+    """
+    
+    def __init__(self, id: int = 1):
+        self.id = id
+        self.object_width = None  # 被夹物体宽度(mm)，None表示空夹
+        self.transactions = 0
+        self._lock = threading.Lock()
+        self._registers = [0] * REGISTER_COUNT
+        self._clamping = _Axis(0x02, 0x04, 0x06, 0x41, 0x42, CLAMPING_RANGE)
+        self._rotation = _Axis(0x0A, 0x0E, 0x14, 0x48, 0x4A)
+        self._last_update = time.monotonic()
+        self._init_done_at = None
+        self.reset()
+    
+    def reset(self):
+        """恢复上电默认值"""
+        with self._lock:
+            regs = self._registers
+            regs[:] = [0] * REGISTER_COUNT
+            regs[0x80] = self.id
+            regs[0x81] = BAUD_RATES.index(115200)
+            regs[0x9F] = 50
+            regs[0x16] = 1
+            regs[0x40] = 5
+            regs[0x04:0x06] = _float_to_words(50.0)
+            regs[0x06:0x08] = _float_to_words(0.3)
+            regs[0x0E:0x10] = _float_to_words(360.0)
+            regs[0x14:0x16] = _float_to_words(0.5)
+            for axis in (self._clamping, self._rotation):
+                axis.value = axis.target = axis.velocity = 0.0
+                axis.status = 0
+                axis.fault = None
+            self._last_update = time.monotonic()
+            self._sync_feedback()
+    
+    @property
+    def baud_rate(self) -> int:
+        index = self._registers[0x81]
+        return BAUD_RATES[index] if 0 <= index < len(BAUD_RATES) else 0
+    
+    def inject_fault(self, fault: str):
+        """注入故障: drop(夹持掉落)、blocked(旋转受阻)、stall(旋转堵转)"""
+        with self._lock:
+            self._advance()
+            if fault == "drop":
+                self._clamping.fault = 3
+            elif fault == "blocked":
+                self._rotation.fault = 2
+            elif fault == "stall":
+                self._rotation.fault = 4
+            else:
+                raise ValueError(f"未知的故障类型: {fault}")
+            self._sync_feedback()
+    
+    def clear_fault(self):
+        with self._lock:
+            self._clamping.fault = None
+            self._rotation.fault = None
+            self._sync_feedback()
+    
+    def read(self, address: int, count: int):
+        """读取寄存器，地址越界时返回None"""
+        if address < 0 or count < 1 or address + count > REGISTER_COUNT:
+            return None
+        with self._lock:
+            self.transactions += 1
+            self._advance()
+            return list(self._registers[address:address + count])
+    
+    def write(self, address: int, values) -> bool:
+        """写入寄存器，地址越界时返回False"""
+        if address < 0 or not values or address + len(values) > REGISTER_COUNT:
+            return False
+        with self._lock:
+            self.transactions += 1
+            self._advance()
+            end = address + len(values)
+            self._registers[address:end] = [int(value) & 0xFFFF for value in values]
+            for axis in (self._clamping, self._rotation):
+                if address <= axis.target_address + 1 and end > axis.target_address:
+                    self._start(axis)
+            self._apply_commands(address, end)
+            self._sync_feedback()
+            return True
+    
+    def _start(self, axis: _Axis):
+        target = _words_to_float(self._registers[axis.target_address:axis.target_address + 2])
+        if axis.limits is not None:
+            target = min(max(target, axis.limits[0]), axis.limits[1])
+        axis.target = target
+        axis.fault = None if axis.fault in (2, 4) else axis.fault
+        if self._registers[0x16] != 1:
+            return  # 电机未使能不运动
+        axis.status = 1 if abs(axis.target - axis.value) > 1e-6 else 0
+    
+    def _apply_commands(self, start: int, end: int):
+        regs = self._registers
+        if start <= 0x00 < end and regs[0x00] == 1:
+            regs[0x40] = 1
+            self._init_done_at = time.monotonic() + INIT_DURATION
+        if start <= 0x8F < end and regs[0x8F] == 1:
+            # 复位多圈转动值，角度折算到一圈以内
+            self._rotation.value %= 360.0
+            self._rotation.target = self._rotation.value
+            regs[0x8F] = 0
+    
+    def _advance(self):
+        # 按距上次访问经过的时间推进运动
+        now = time.monotonic()
+        elapsed = now - self._last_update
+        self._last_update = now
+        regs = self._registers
+        if self._init_done_at is not None and now >= self._init_done_at:
+            regs[0x40] = 5
+            self._init_done_at = None
+        
+        for axis in (self._clamping, self._rotation):
+            axis.velocity = 0.0
+            if axis.status != 1 or axis.fault is not None:
+                continue
+            speed = abs(_words_to_float(regs[axis.speed_address:axis.speed_address + 2]))
+            remaining = axis.target - axis.value
+            step = speed * elapsed
+            stop_at = None
+            if axis is self._clamping and self.object_width is not None and axis.target < self.object_width <= axis.value:
+                stop_at = self.object_width  # 闭合时碰到物体
+            if stop_at is not None and axis.value - step <= stop_at:
+                axis.value = stop_at
+                axis.status = 2
+            elif step >= abs(remaining):
+                axis.value = axis.target
+                axis.status = 0
+            else:
+                axis.value += step if remaining > 0 else -step
+                axis.velocity = speed
+        self._sync_feedback()
+    
+    def _sync_feedback(self):
+        regs = self._registers
+        for axis, speed_address, current_address in ((self._clamping, 0x44, 0x46), (self._rotation, 0x4C, 0x4E)):
+            regs[axis.status_address] = axis.fault if axis.fault is not None else axis.status
+            regs[axis.value_address:axis.value_address + 2] = _float_to_words(axis.value)
+            regs[speed_address:speed_address + 2] = _float_to_words(axis.velocity)
+            moving_or_holding = axis.status in (1, 2) and axis.fault is None
+            current = _words_to_float(regs[axis.current_set_address:axis.current_set_address + 2]) if moving_or_holding else 0.0
+            regs[current_address:current_address + 2] = _float_to_words(current)
+
+class ControllerSimulator:
+    """控制器: 各485通道上的夹爪、串口参数和数字输出"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.grippers = {}  # (通道, 夹爪ID) -> GripperSimulator
+        self.channel_params = {}  # 通道 -> SerialParams
+        self.digital_outputs = {}  # 编号 -> SignalValue
+        self.digital_inputs = {}
+        self.connections = 0
+    
+    def gripper(self, id: int = 1, channel=None) -> GripperSimulator:
+        """获取(不存在时创建)指定通道上的夹爪模型，channel为None时使用WRIST_485_0"""
+        key = (_channel_name(channel), id)
+        with self._lock:
+            if key not in self.grippers:
+                self.grippers[key] = GripperSimulator(id)
+            return self.grippers[key]
+    
+    def reset(self):
+        with self._lock:
+            self.grippers.clear()
+            self.channel_params.clear()
+            self.digital_outputs.clear()
+            self.digital_inputs.clear()
+
+def _channel_name(channel) -> str:
+    if channel is None:
+        return "WRIST_485_0"
+    return getattr(channel, "name", str(channel))
+
+controller = ControllerSimulator()
+
+def gripper(id: int = 1, channel=None) -> GripperSimulator:
+    """获取模拟夹爪，用于设置物体宽度或注入故障"""
+    return controller.gripper(id, channel)
+
+def reset():
+    """清除所有模拟状态"""
+    controller.reset()
+
+def transaction_delay(timeout_ms: float) -> bool:
+    """
+    模拟一次总线事务的耗时
+    
+    Returns:
+        bool: 本次事务是否超时
+    """
+    if config.timeout_rate > 0 and _random.random() < config.timeout_rate:
+        time.sleep(min(timeout_ms / 1000.0, MAX_TIMEOUT_SLEEP))
+        return True
+    delay = config.latency_ms + _random.uniform(-config.jitter_ms, config.jitter_ms)
+    if delay > 0:
+        time.sleep(delay / 1000.0)
+    return False
@@ -0,0 +1,20 @@
+from enum import Enum
+
+class StatusCodeEnum(Enum):
+    """模拟SDK状态码，值为(编号, 错误信息)"""
+
+    OK = (0, "成功")
+    CONNECT_FAILED = (1001, "控制器连接失败")
+    NOT_CONNECTED = (1002, "控制器未连接")
+    INVALID_PARAMETER = (2001, "参数错误")
+    MODBUS_NOT_CONFIGURED = (3001, "Modbus通道未设置参数")
+    MODBUS_TIMEOUT = (3002, "Modbus通信超时")
+    MODBUS_ILLEGAL_ADDRESS = (3003, "Modbus寄存器地址非法")
+    
+    @property
+    def code(self) -> int:
+        return self.value[0]
+    
+    @property
+    def errmsg(self) -> str:
+        return self.value[1]
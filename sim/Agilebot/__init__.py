@@ -0,0 +1,11 @@
+"""
+Agilebot SDK离线模拟包
+
+与真实SDK的Agilebot.IR.A接口同名，把sim目录放在PYTHONPATH最前面即可替换真实SDK，
+在没有控制器的普通Linux机器上运行HLUI和HL:
+
+    PYTHONPATH=sim python HLUI/HLUI/app.py
+    PYTHONPATH=sim python -c "import sys; sys.path.insert(0, 'HLZL/HL'); import HL; HL.connect(1)"
+
+夹爪寄存器模型、延迟和故障注入见Agilebot.IR.A.simulator。
+"""